@@ -0,0 +1,236 @@
+"""
+RIQUEZA BABILÔNICA - Suíte de benchmarks
+Mede as operações críticas do DatabaseManager e dos cálculos financeiros
+sobre um livro-caixa sintético e determinístico.
+
+Uso:
+    python benchmark.py --tamanho 10k
+    python benchmark.py --tamanho 1m --gravar-baseline
+    python benchmark.py --tamanho 10m --banco /tmp/livro.db --repeticoes 10
+    python benchmark.py --ciclos-widgets 200
+"""
+
+import os
+
+# O Kivy interpreta sys.argv ao ser importado; as opções aqui são nossas
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from kivy.clock import Clock
+
+from main import (
+    CATEGORIAS_DESPESA, CATEGORIAS_RECEITA, DatabaseManager, TelaMeuDinheiro, memoria, percentil,
+    simular_investimento,
+)
+
+TAMANHOS = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+CAMINHO_BASELINE = 'benchmark_baseline.json'
+TAMANHO_LOTE = 50_000
+# Ciclos descartados antes da medição: caches de fonte e textura do Kivy se estabilizam
+CICLOS_AQUECIMENTO = 5
+# Métricas comparadas com a baseline
+METRICAS_COMPARADAS = ('p50', 'p99', 'widgets_retidos', 'instrucoes_retidas', 'sobreviventes', 'kb_retidos')
+# Diferença mínima em ms para contar como regressão: abaixo disso é ruído do relógio/agendador
+FOLGA_ABSOLUTA_MS = 0.1
+# Fração do livro datada no mês corrente: fixa, para o recorte medido não depender do dia da execução
+FRACAO_MES_ATUAL = 1 / 36
+
+CATEGORIAS = {'receita': CATEGORIAS_RECEITA, 'despesa': CATEGORIAS_DESPESA}
+DESCRICOES = ['Mercado', 'Aluguel', 'Uber', 'Cinema', 'Projeto', 'Dividendos', 'Farmácia', '']
+
+
+# ==================== GERADOR DE LIVRO SINTÉTICO ====================
+def gerar_livro_sintetico(quantidade, semente=42, data_referencia=None, dias=3 * 365):
+    """Gera transações (tipo, categoria, valor, descricao, data) de forma determinística.
+
+    A mesma semente sempre produz o mesmo livro. Uma fração fixa (FRACAO_MES_ATUAL)
+    cai no dia 1º do mês da referência; o resto se espalha pelos `dias` anteriores a ele.
+    Assim o mês corrente tem o mesmo tamanho em qualquer dia em que a suíte rode.
+    """
+    rng = random.Random(semente)
+    inicio_mes = (data_referencia or datetime.now()).replace(day=1)
+    for _ in range(quantidade):
+        tipo = 'receita' if rng.random() < 0.3 else 'despesa'
+        categoria = rng.choice(CATEGORIAS[tipo])
+        valor = round(rng.lognormvariate(4.5, 1.0), 2)
+        descricao = rng.choice(DESCRICOES)
+        if rng.random() < FRACAO_MES_ATUAL:
+            data = inicio_mes
+        else:
+            data = inicio_mes - timedelta(days=rng.randrange(1, dias))
+        yield tipo, categoria, valor, descricao, data.strftime('%Y-%m-%d')
+
+
+def popular_banco(db, quantidade, semente=42):
+    """Insere o livro sintético em lotes para manter a memória constante"""
+    lote = []
+    for transacao in gerar_livro_sintetico(quantidade, semente):
+        lote.append(transacao)
+        if len(lote) >= TAMANHO_LOTE:
+            db.adicionar_transacoes_lote(lote)
+            lote = []
+    if lote:
+        db.adicionar_transacoes_lote(lote)
+
+
+# ==================== MEDIÇÃO ====================
+def medir(funcao, repeticoes):
+    """Executa `funcao` repetidamente e retorna p50/p99 em milissegundos"""
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    amostras.sort()
+    return {'p50': percentil(amostras, 50), 'p99': percentil(amostras, 99)}
+
+
+def casos_de_teste(db):
+    """Operações medidas pela suíte, na ordem em que são executadas"""
+    rng = random.Random(7)
+    return [
+        ('adicionar_transacao', lambda: db.adicionar_transacao(
+            'despesa', rng.choice(CATEGORIAS['despesa']), 42.0, 'benchmark')),
+        ('obter_saldo', db.obter_saldo),
+        ('obter_transacoes_mes_atual', db.obter_transacoes_mes_atual),
+        ('obter_licoes', db.obter_licoes),
+        ('simular_investimento', lambda: [
+            simular_investimento(10_000, 0.125, meses) for meses in range(1, 41)]),
+    ]
+
+
+def processar_quadros(quantidade=3):
+    for _ in range(quantidade):
+        Clock.tick()
+
+
+def medir_ciclos_widgets(ciclos):
+    """Alterna formulário e lista do Meu Dinheiro e mede o que sobrevive às reconstruções"""
+    db = DatabaseManager(':memory:')
+    try:
+        popular_banco(db, 200)
+        tela = TelaMeuDinheiro(db)
+        processar_quadros()
+        # Sem pilha de chamadas: aqui só interessam os totais, e o rastreio completo é lento
+        memoria.iniciar(quadros=1)
+
+        def ciclo():
+            tela.mostrar_formulario('despesa')
+            processar_quadros()
+            tela.atualizar_transacoes()
+            processar_quadros()
+            return memoria.conferir_descartes(prazo=0)
+
+        for _ in range(CICLOS_AQUECIMENTO):
+            ciclo()
+        widgets_antes, instrucoes_antes = memoria.contar_vivos()
+        kb_antes = tracemalloc.get_traced_memory()[0] / 1024
+        for _ in range(ciclos):
+            retidos = ciclo()
+        widgets_depois, instrucoes_depois = memoria.contar_vivos()
+        kb_depois = tracemalloc.get_traced_memory()[0] / 1024
+        return {
+            'widgets_retidos': sum(widgets_depois.values()) - sum(widgets_antes.values()),
+            'instrucoes_retidas': sum(instrucoes_depois.values()) - sum(instrucoes_antes.values()),
+            'sobreviventes': sum(sum(contagem.values()) for contagem in retidos.values()),
+            'kb_retidos': round(kb_depois - kb_antes, 1),
+        }
+    finally:
+        memoria.parar()
+        db.conn.close()
+
+
+def executar(tamanho, caminho_banco, repeticoes, semente, ciclos_widgets=0):
+    db = DatabaseManager(caminho_banco)
+    try:
+        inicio = time.perf_counter()
+        popular_banco(db, TAMANHOS[tamanho], semente)
+        print(f'Livro de {tamanho} gerado em {time.perf_counter() - inicio:.1f}s')
+        resultados = {}
+        for nome, funcao in casos_de_teste(db):
+            resultados[nome] = medir(funcao, repeticoes)
+            print(f"{nome:30s} p50={resultados[nome]['p50']:9.3f}ms  p99={resultados[nome]['p99']:9.3f}ms")
+    finally:
+        db.conn.close()
+
+    if ciclos_widgets:
+        resultados['ciclos_widgets'] = metricas = medir_ciclos_widgets(ciclos_widgets)
+        print(f"{'ciclos_widgets':30s} " + '  '.join(f'{chave}={valor}' for chave, valor in metricas.items()))
+    return resultados
+
+
+# ==================== BASELINE ====================
+def carregar_baseline(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_baseline(caminho, tamanho, resultados):
+    baseline = carregar_baseline(caminho)
+    baseline[tamanho] = resultados
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(baseline, arquivo, indent=2, sort_keys=True)
+
+
+def comparar_com_baseline(resultados, referencia, tolerancia, folga_ms=FOLGA_ABSOLUTA_MS):
+    """Retorna as regressões que ultrapassam a tolerância relativa (e, nos tempos, a folga absoluta)"""
+    regressoes = []
+    for nome, metricas in resultados.items():
+        for chave in METRICAS_COMPARADAS:
+            limite = referencia.get(nome, {}).get(chave)
+            if chave not in metricas or limite is None or metricas[chave] <= limite * (1 + tolerancia):
+                continue
+            unidade = 'ms' if chave in ('p50', 'p99') else ''
+            if unidade and metricas[chave] - limite < folga_ms:
+                continue
+            regressoes.append(
+                f'{nome} {chave}: {metricas[chave]:.3f}{unidade} > {limite:.3f}{unidade} (+{tolerancia:.0%})'
+            )
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do Riqueza Babilônica')
+    parser.add_argument('--tamanho', choices=sorted(TAMANHOS), default='10k')
+    parser.add_argument('--banco', default=':memory:',
+                        help="caminho de um SQLite novo (padrão: ':memory:'); arquivo existente é recusado")
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--baseline', default=CAMINHO_BASELINE)
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='regressão relativa aceita antes de falhar (padrão: 0.25)')
+    parser.add_argument('--ciclos-widgets', type=int, default=30,
+                        help='reconstruções da lista do Meu Dinheiro medidas para vazamentos (0 = pular)')
+    parser.add_argument('--gravar-baseline', action='store_true')
+    args = parser.parse_args(argv)
+    # O livro sintético seria somado ao que já existe (ou ao livro de verdade do usuário)
+    if args.banco != ':memory:' and os.path.exists(args.banco) and os.path.getsize(args.banco):
+        parser.error(f'{args.banco} já existe e não está vazio; use um arquivo novo')
+
+    resultados = executar(args.tamanho, args.banco, args.repeticoes, args.semente, args.ciclos_widgets)
+    if args.gravar_baseline:
+        gravar_baseline(args.baseline, args.tamanho, resultados)
+        print(f'Baseline gravada em {args.baseline}')
+        return 0
+
+    referencia = carregar_baseline(args.baseline).get(args.tamanho)
+    if not referencia:
+        print('Sem baseline para este tamanho; use --gravar-baseline')
+        return 0
+    regressoes = comparar_com_baseline(resultados, referencia, args.tolerancia)
+    for regressao in regressoes:
+        print(f'⚠ REGRESSÃO: {regressao}')
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,8 +4,20 @@ Baseado nos princípios atemporais de "O Homem Mais Rico da Babilônia"
 Desenvolvido com Kivy/KivyMD para interface moderna e responsiva
 """
 
+# Marcado antes dos imports do Kivy para que o rastro de inicialização os inclua
+import time
+_INICIO_PROCESSO = time.perf_counter()
+
+import os
+import sys
+
+# No modo servidor as opções da linha de comando são nossas, não do Kivy
+if '--servidor' in sys.argv:
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
+from kivy.uix.widget import Widget
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.scrollview import ScrollView
@@ -15,19 +27,134 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.spinner import Spinner
 from kivy.uix.progressbar import ProgressBar
 from kivy.graphics import Color, Rectangle, RoundedRectangle
+from kivy.graphics.instructions import Instruction
 from kivy.metrics import dp
 from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.logger import Logger
+from kivy.utils import platform
+import argparse
+import calendar
+import collections
+import contextlib
+import functools
+import gc
+import hashlib
+import heapq
+import http.server
+import itertools
+import json
+import math
+import pathlib
+import queue
+import re
+import secrets
 import sqlite3
-from datetime import datetime
+import threading
+import tracemalloc
+import urllib.parse
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+__version__ = '1.0'
 
 
 # ==================== CONFIGURAÇÕES E BANCO DE DADOS ====================
+# Caminho do banco; aceita ':memory:' para testes e benchmarks
+CAMINHO_BANCO = os.environ.get('RIQUEZA_BANCO', 'riqueza_babilonica.db')
+# Diagnóstico opcional de quadros lentos (RIQUEZA_PERFIL=1)
+PERFIL_ATIVO = os.environ.get('RIQUEZA_PERFIL') == '1'
+# Rastro opcional das fases de inicialização (RIQUEZA_RASTRO_INICIO=1)
+RASTRO_INICIO_ATIVO = os.environ.get('RIQUEZA_RASTRO_INICIO') == '1'
+# Instrumentação opcional de memória e de widgets sobreviventes (RIQUEZA_MEMORIA=1)
+MEMORIA_ATIVA = os.environ.get('RIQUEZA_MEMORIA') == '1'
+
+CATEGORIAS_RECEITA = ['Salário', 'Freelance', 'Investimentos']
+CATEGORIAS_DESPESA = ['Alimentação', 'Transporte', 'Moradia', 'Lazer', 'Outros']
+# Frações do limite mensal que disparam alerta de orçamento (2ª Lei)
+NIVEIS_ALERTA_ORCAMENTO = (0.8, 1.0)
+# Tamanho da prévia exibida nos cartões da Principia e lições por página
+TAMANHO_PREVIA_LICAO = 150
+LICOES_POR_PAGINA = 10
+# Transações do mês guardadas no instantâneo do painel para a primeira pintura
+TRANSACOES_NO_PAINEL = 20
+# Opções de repetição do formulário -> (frequência, intervalo); 'dias' usa o intervalo digitado
+FREQUENCIAS_RECORRENCIA = {
+    'Não repetir': None,
+    'Mensal': ('mensal', 1),
+    'Semanal': ('semanal', 1),
+    'A cada N dias': ('dias', None),
+}
+FREQUENCIAS_VALIDAS = ('mensal', 'semanal', 'dias')
+
+
+class RastreadorInicio:
+    """Cronometra cada fase da inicialização, do início do processo ao primeiro quadro"""
+    MAXIMO_RASTROS = 20
+
+    def __init__(self, inicio, ativo):
+        self.inicio = inicio
+        self.ultimo = inicio
+        self.ativo = ativo
+        self.fases = []  # (fase, duração em ms, tempo acumulado em ms)
+
+    def marcar(self, fase):
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        self.fases.append((fase, (agora - self.ultimo) * 1000, (agora - self.inicio) * 1000))
+        self.ultimo = agora
+
+    def persistir(self, caminho):
+        """Acrescenta o rastro atual ao histórico, mantendo apenas os últimos MAXIMO_RASTROS"""
+        if not self.ativo or not self.fases:
+            return
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                historico = json.load(arquivo)
+        except (OSError, ValueError):
+            historico = []
+        historico.append({
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'versao': __version__,
+            'total_ms': round(self.fases[-1][2], 2),
+            'fases': [{'fase': fase, 'ms': round(ms, 2)} for fase, ms, _ in self.fases],
+        })
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(historico[-self.MAXIMO_RASTROS:], arquivo, ensure_ascii=False, indent=1)
+
+
+rastro_inicio = RastreadorInicio(_INICIO_PROCESSO, RASTRO_INICIO_ATIVO)
+rastro_inicio.marcar('imports')
+
+
+def sincronizado(metodo):
+    """Serializa o acesso à conexão, que também é usada por threads de trabalho"""
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self.trava:
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
 class DatabaseManager:
     """Gerencia todas as operações do banco de dados SQLite"""
 
-    def __init__(self):
-        self.conn = sqlite3.connect('riqueza_babilonica.db')
+    def __init__(self, caminho=CAMINHO_BANCO, somente_leitura=False):
+        self.caminho = caminho
+        self.trava = threading.RLock()
+        if somente_leitura:
+            # Conexões extras do modo servidor: o esquema já foi criado pelo escritor
+            # Caminho convertido em URI escapada ('#', '?' e '%' são válidos em nomes de arquivo)
+            uri = pathlib.Path(caminho).resolve().as_uri() + '?mode=ro'
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self.cursor = self.conn.cursor()
+            return
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        rastro_inicio.marcar('db_abrir')
         self.create_tables()
 
     def create_tables(self):
@@ -52,6 +179,22 @@ class DatabaseManager:
                 concluida INTEGER DEFAULT 0
             )
         ''')
+        self.cursor.execute('PRAGMA table_info(licoes)')
+        if 'previa' not in [coluna[1] for coluna in self.cursor.fetchall()]:
+            self.cursor.execute('ALTER TABLE licoes ADD COLUMN previa TEXT')
+            self.cursor.execute(
+                'UPDATE licoes SET previa = substr(conteudo, 1, ?)', (TAMANHO_PREVIA_LICAO,)
+            )
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_licoes_ordem'")
+        if self.cursor.fetchone() is None:
+            # Versões antigas duplicavam as lições a cada abertura; mantém a mais antiga de cada ordem
+            self.cursor.execute('''
+                UPDATE licoes SET concluida = 1 WHERE id IN (
+                    SELECT MIN(id) FROM licoes GROUP BY ordem HAVING MAX(concluida) = 1
+                )
+            ''')
+            self.cursor.execute('DELETE FROM licoes WHERE id NOT IN (SELECT MIN(id) FROM licoes GROUP BY ordem)')
+            self.cursor.execute('CREATE UNIQUE INDEX idx_licoes_ordem ON licoes(ordem)')
         # Tabela de transações pessoais
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS transacoes(
@@ -97,8 +240,83 @@ class DatabaseManager:
                 data_criacao TEXT
             )
         ''')
+        # Contador de alterações que versiona o instantâneo do painel
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS metadados(
+                chave TEXT PRIMARY KEY,
+                valor INTEGER
+            )
+        ''')
+        self.cursor.execute("INSERT OR IGNORE INTO metadados(chave, valor) VALUES ('versao', 0)")
+        # Identidade aleatória do banco: um banco recriado ou trocado não herda o instantâneo de outro
+        self.cursor.execute(
+            "INSERT OR IGNORE INTO metadados(chave, valor) VALUES ('id_banco', ?)", (secrets.randbits(63),)
+        )
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_transacoes_data ON transacoes(data)')
+        # Cenários de equilíbrio calculados para cada plano (cache persistente)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cenarios_negocio(
+                chave TEXT PRIMARY KEY,
+                negocio_id INTEGER,
+                resultado TEXT,
+                data_criacao TEXT
+            )
+        ''')
+        # Tabela de orçamentos mensais por categoria de despesa
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS orcamentos(
+                categoria TEXT PRIMARY KEY,
+                limite REAL
+            )
+        ''')
+        # Gasto acumulado por mês e categoria, mantido a cada inserção
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='gastos_mensais'")
+        gastos_existia = self.cursor.fetchone() is not None
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS gastos_mensais(
+                mes TEXT,
+                categoria TEXT,
+                total REAL DEFAULT 0,
+                PRIMARY KEY (mes, categoria)
+            )
+        ''')
+        if not gastos_existia:
+            self.cursor.execute('''
+                INSERT INTO gastos_mensais(mes, categoria, total)
+                SELECT substr(data, 1, 7), categoria, SUM(valor)
+                FROM transacoes WHERE tipo = 'despesa'
+                GROUP BY substr(data, 1, 7), categoria
+            ''')
+        # Tabela de transações recorrentes (salário, aluguel...)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recorrencias(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT,
+                categoria TEXT,
+                valor REAL,
+                descricao TEXT,
+                frequencia TEXT,
+                intervalo INTEGER DEFAULT 1,
+                data_inicio TEXT,
+                proxima_ocorrencia INTEGER DEFAULT 0,
+                proxima_data TEXT,
+                ativa INTEGER DEFAULT 1
+            )
+        ''')
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_recorrencias_proxima ON recorrencias(ativa, proxima_data)'
+        )
+        self.cursor.execute('PRAGMA table_info(transacoes)')
+        if 'recorrencia_id' not in [coluna[1] for coluna in self.cursor.fetchall()]:
+            self.cursor.execute('ALTER TABLE transacoes ADD COLUMN recorrencia_id INTEGER')
+        # Garante que cada ocorrência de uma regra seja materializada uma única vez
+        self.cursor.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_recorrencia ON transacoes(recorrencia_id, data)'
+        )
         self.conn.commit()
+        rastro_inicio.marcar('esquema')
         self.inserir_licoes_iniciais()
+        rastro_inicio.marcar('sementes')
 
     def inserir_licoes_iniciais(self):
         """Insere as 7 Leis de Ouro da Babilônia (apenas 3 no MVP)"""
@@ -128,21 +346,217 @@ class DatabaseManager:
                 3
             ),
         ]
-        for titulo, conteudo, ordem in licoes:
-            self.cursor.execute('''
-                INSERT OR IGNORE INTO licoes(titulo, conteudo, ordem)
-                VALUES (?, ?, ?)
-            ''', (titulo, conteudo, ordem))
+        self.cursor.executemany('''
+            INSERT OR IGNORE INTO licoes(titulo, conteudo, previa, ordem)
+            VALUES (?, ?, ?, ?)
+        ''', [(titulo, conteudo, conteudo[:TAMANHO_PREVIA_LICAO], ordem) for titulo, conteudo, ordem in licoes])
         self.conn.commit()
 
+    @sincronizado
     def adicionar_transacao(self, tipo, categoria, valor, descricao):
-        """Adiciona uma transação (receita ou despesa)"""
+        """Adiciona uma transação (receita ou despesa).
+
+        Retorna o alerta de orçamento disparado por esta despesa, ou None.
+        """
+        data = datetime.now().strftime('%Y-%m-%d')
         self.cursor.execute('''
             INSERT INTO transacoes(tipo, categoria, valor, descricao, data)
             VALUES (?, ?, ?, ?, ?)
-        ''', (tipo, categoria, valor, descricao, datetime.now().strftime('%Y-%m-%d')))
+        ''', (tipo, categoria, valor, descricao, data))
+        alerta = None
+        if tipo == 'despesa':
+            mes = data[:7]
+            self.cursor.execute(
+                'SELECT total FROM gastos_mensais WHERE mes = ? AND categoria = ?', (mes, categoria)
+            )
+            linha = self.cursor.fetchone()
+            total_anterior = linha[0] if linha else 0
+            self._somar_gasto_mensal(mes, categoria, valor)
+            alerta = self.avaliar_alerta_orcamento(categoria, total_anterior, total_anterior + valor)
+        self._registrar_alteracao()
+        self.conn.commit()
+        return alerta
+
+    @sincronizado
+    def adicionar_transacoes_lote(self, transacoes):
+        """Insere várias transações (tipo, categoria, valor, descricao, data) numa única transação"""
+        transacoes = list(transacoes)
+        self.cursor.executemany('''
+            INSERT INTO transacoes(tipo, categoria, valor, descricao, data)
+            VALUES (?, ?, ?, ?, ?)
+        ''', transacoes)
+        self._acumular_gastos(transacoes)
+        self._registrar_alteracao()
+        self.conn.commit()
+
+    def _acumular_gastos(self, transacoes):
+        """Soma as despesas por mês e categoria e aplica um upsert por grupo"""
+        gastos = {}
+        for tipo, categoria, valor, _, data in transacoes:
+            if tipo == 'despesa':
+                chave = (data[:7], categoria)
+                gastos[chave] = gastos.get(chave, 0) + valor
+        for (mes, categoria), valor in gastos.items():
+            self._somar_gasto_mensal(mes, categoria, valor)
+
+    def _registrar_alteracao(self):
+        self.cursor.execute("UPDATE metadados SET valor = valor + 1 WHERE chave = 'versao'")
+
+    @sincronizado
+    def obter_versao(self):
+        """Contador de alterações do livro e das lições; muda a cada escrita relevante ao painel"""
+        self.cursor.execute("SELECT valor FROM metadados WHERE chave = 'versao'")
+        return self.cursor.fetchone()[0]
+
+    @sincronizado
+    def obter_id_banco(self):
+        """Identificador aleatório gravado na criação do banco"""
+        self.cursor.execute("SELECT valor FROM metadados WHERE chave = 'id_banco'")
+        return self.cursor.fetchone()[0]
+
+    @sincronizado
+    def obter_painel(self, limite=TRANSACOES_NO_PAINEL):
+        """Estado consistente do painel (saldo, transações recentes, lições e carteira)"""
+        licoes_total, licoes_concluidas = self.contar_licoes()
+        return {
+            'banco': self.obter_id_banco(),
+            'versao': self.obter_versao(),
+            'mes': datetime.now().strftime('%Y-%m'),
+            'saldo': self.obter_saldo(),
+            'transacoes': self.obter_transacoes_mes_atual()[:limite],
+            'licoes_total': licoes_total,
+            'licoes_concluidas': licoes_concluidas,
+            'carteira_total': self.obter_total_carteira(),
+        }
+
+    @sincronizado
+    def obter_total_carteira(self):
+        self.cursor.execute('SELECT COALESCE(SUM(valor_inicial), 0) FROM investimentos')
+        return self.cursor.fetchone()[0]
+
+    def _somar_gasto_mensal(self, mes, categoria, valor):
+        self.cursor.execute('''
+            INSERT INTO gastos_mensais(mes, categoria, total) VALUES (?, ?, ?)
+            ON CONFLICT(mes, categoria) DO UPDATE SET total = total + excluded.total
+        ''', (mes, categoria, valor))
+
+    @sincronizado
+    def definir_orcamento(self, categoria, limite):
+        """Define o limite mensal da categoria; limite vazio ou zero remove o orçamento"""
+        if limite:
+            self.cursor.execute(
+                'INSERT OR REPLACE INTO orcamentos(categoria, limite) VALUES (?, ?)', (categoria, limite)
+            )
+        else:
+            self.cursor.execute('DELETE FROM orcamentos WHERE categoria = ?', (categoria,))
+        self.conn.commit()
+
+    @sincronizado
+    def obter_orcamentos(self, mes=None):
+        """Retorna (categoria, limite, gasto no mês) de cada orçamento definido"""
+        mes = mes or datetime.now().strftime('%Y-%m')
+        self.cursor.execute('''
+            SELECT o.categoria, o.limite, COALESCE(g.total, 0)
+            FROM orcamentos o
+            LEFT JOIN gastos_mensais g ON g.categoria = o.categoria AND g.mes = ?
+            ORDER BY o.categoria
+        ''', (mes,))
+        return self.cursor.fetchall()
+
+    @sincronizado
+    def avaliar_alerta_orcamento(self, categoria, total_anterior, total_novo):
+        """Retorna (categoria, nível, total, limite) se a despesa cruzou um nível de alerta"""
+        self.cursor.execute('SELECT limite FROM orcamentos WHERE categoria = ?', (categoria,))
+        linha = self.cursor.fetchone()
+        if not linha or not linha[0]:
+            return None
+        limite = linha[0]
+        cruzados = [nivel for nivel in NIVEIS_ALERTA_ORCAMENTO
+                    if total_anterior < limite * nivel <= total_novo]
+        if not cruzados:
+            return None
+        return categoria, max(cruzados), total_novo, limite
+
+    @sincronizado
+    def adicionar_recorrencia(self, tipo, categoria, valor, descricao, frequencia, intervalo=1, data_inicio=None):
+        """Cadastra uma regra recorrente ('mensal', 'semanal' ou a cada `intervalo` 'dias')"""
+        validar_recorrencia(frequencia, intervalo)
+        inicio = (data_inicio or date.today()).strftime('%Y-%m-%d')
+        self.cursor.execute('''
+            INSERT INTO recorrencias(tipo, categoria, valor, descricao, frequencia, intervalo, data_inicio, proxima_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (tipo, categoria, valor, descricao, frequencia, intervalo, inicio, inicio))
+        self.conn.commit()
+        return self.cursor.lastrowid
+
+    @sincronizado
+    def obter_recorrencias(self, tipo=None):
+        """Retorna (id, tipo, categoria, valor, descricao, frequencia, intervalo) das regras ativas"""
+        consulta = '''
+            SELECT id, tipo, categoria, valor, descricao, frequencia, intervalo
+            FROM recorrencias WHERE ativa = 1
+        '''
+        if tipo:
+            self.cursor.execute(consulta + ' AND tipo = ? ORDER BY id', (tipo,))
+        else:
+            self.cursor.execute(consulta + ' ORDER BY id')
+        return self.cursor.fetchall()
+
+    @sincronizado
+    def desativar_recorrencia(self, recorrencia_id):
+        """Encerra a regra; as ocorrências já lançadas permanecem no histórico"""
+        self.cursor.execute('UPDATE recorrencias SET ativa = 0 WHERE id = ?', (recorrencia_id,))
         self.conn.commit()
 
+    @sincronizado
+    def materializar_recorrencias(self, hoje=None):
+        """Lança numa única transação todas as ocorrências vencidas desde a última execução.
+
+        Só as regras com proxima_data vencida são lidas, então o custo depende das
+        ocorrências pendentes e não do tamanho do livro. O índice único em
+        (recorrencia_id, data) torna a operação idempotente. Retorna quantas
+        transações foram inseridas.
+        """
+        hoje = hoje or date.today()
+        self.cursor.execute('''
+            SELECT id, tipo, categoria, valor, descricao, frequencia, intervalo, data_inicio, proxima_ocorrencia
+            FROM recorrencias WHERE ativa = 1 AND proxima_data <= ?
+        ''', (hoje.strftime('%Y-%m-%d'),))
+        regras = self.cursor.fetchall()
+
+        inseridas = []
+        for (recorrencia_id, tipo, categoria, valor, descricao,
+             frequencia, intervalo, data_inicio, ocorrencia) in regras:
+            inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+            data = calcular_ocorrencia(inicio, frequencia, intervalo, ocorrencia)
+            while data <= hoje:
+                transacao = (tipo, categoria, valor, descricao, data.strftime('%Y-%m-%d'))
+                self.cursor.execute('''
+                    INSERT OR IGNORE INTO transacoes(tipo, categoria, valor, descricao, data, recorrencia_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', transacao + (recorrencia_id,))
+                if self.cursor.rowcount == 1:
+                    inseridas.append(transacao)
+                ocorrencia += 1
+                anterior, data = data, calcular_ocorrencia(inicio, frequencia, intervalo, ocorrencia)
+                if data <= anterior:
+                    break
+            if data <= hoje:
+                # Regra gravada antes da validação: sem avançar, o laço nunca terminaria
+                Logger.error(f'Recorrencia: regra {recorrencia_id} ({frequencia!r}, {intervalo!r}) desativada')
+                self.cursor.execute('UPDATE recorrencias SET ativa = 0 WHERE id = ?', (recorrencia_id,))
+                continue
+            self.cursor.execute(
+                'UPDATE recorrencias SET proxima_ocorrencia = ?, proxima_data = ? WHERE id = ?',
+                (ocorrencia, data.strftime('%Y-%m-%d'), recorrencia_id)
+            )
+        self._acumular_gastos(inseridas)
+        if inseridas:
+            self._registrar_alteracao()
+        self.conn.commit()
+        return len(inseridas)
+
+    @sincronizado
     def obter_saldo(self):
         """Calcula o saldo total (receitas - despesas)"""
         self.cursor.execute("SELECT SUM(valor) FROM transacoes WHERE tipo='receita'")
@@ -151,6 +565,7 @@ class DatabaseManager:
         despesas = self.cursor.fetchone()[0] or 0
         return receitas - despesas
 
+    @sincronizado
     def obter_transacoes_mes_atual(self):
         """Retorna transações do mês atual"""
         primeiro_dia = datetime.now().replace(day=1).strftime('%Y-%m-%d')
@@ -162,17 +577,1093 @@ class DatabaseManager:
         ''', (primeiro_dia,))
         return self.cursor.fetchall()
 
-    def obter_licoes(self):
-        """Retorna todas as lições"""
-        self.cursor.execute('SELECT id, titulo, conteudo, concluida FROM licoes ORDER BY ordem')
+    @sincronizado
+    def resumo_mensal(self, mes):
+        """Retorna (tipo, categoria, total, quantidade) das transações do mês 'AAAA-MM'"""
+        self.cursor.execute('''
+            SELECT tipo, categoria, SUM(valor), COUNT(*)
+            FROM transacoes
+            WHERE data >= ? AND data <= ?
+            GROUP BY tipo, categoria
+            ORDER BY tipo, categoria
+        ''', (f'{mes}-01', f'{mes}-31'))
+        return self.cursor.fetchall()
+
+    def iterar_transacoes(self, inicio, fim, lote=500):
+        """Percorre as transações do período [inicio, fim] em lotes, por data.
+
+        Cada lote é uma consulta curta (paginação por chave), então a trava não
+        fica presa durante a geração de relatórios longos.
+        """
+        ultima = (inicio, 0)
+        while True:
+            with self.trava:
+                self.cursor.execute('''
+                    SELECT id, tipo, categoria, valor, descricao, data
+                    FROM transacoes
+                    WHERE (data > ? OR (data = ? AND id > ?)) AND data <= ?
+                    ORDER BY data, id
+                    LIMIT ?
+                ''', (ultima[0], ultima[0], ultima[1], fim, lote))
+                linhas = self.cursor.fetchall()
+            if not linhas:
+                return
+            yield [linha[1:] for linha in linhas]
+            ultima = (linhas[-1][5], linhas[-1][0])
+
+    @sincronizado
+    def contar_transacoes(self, inicio, fim):
+        self.cursor.execute('SELECT COUNT(*) FROM transacoes WHERE data >= ? AND data <= ?', (inicio, fim))
+        return self.cursor.fetchone()[0]
+
+    @sincronizado
+    def salvar_negocio(self, nome, descricao, investimento_inicial, faturamento_projetado):
+        """Registra um plano de negócios e retorna seu id"""
+        self.cursor.execute('''
+            INSERT INTO negocios(nome, descricao, investimento_inicial, faturamento_projetado, data_criacao)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (nome, descricao, investimento_inicial, faturamento_projetado, datetime.now().strftime('%Y-%m-%d')))
+        self.conn.commit()
+        return self.cursor.lastrowid
+
+    @sincronizado
+    def obter_cenario(self, chave):
+        """Retorna o resultado de cenários já calculado para a chave, ou None"""
+        self.cursor.execute('SELECT resultado FROM cenarios_negocio WHERE chave = ?', (chave,))
+        linha = self.cursor.fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    @sincronizado
+    def salvar_cenario(self, chave, negocio_id, resultado):
+        self.cursor.execute('''
+            INSERT OR REPLACE INTO cenarios_negocio(chave, negocio_id, resultado, data_criacao)
+            VALUES (?, ?, ?, ?)
+        ''', (chave, negocio_id, json.dumps(resultado), datetime.now().strftime('%Y-%m-%d')))
+        self.conn.commit()
+
+    @sincronizado
+    def obter_licoes(self, limite=-1, deslocamento=0):
+        """Retorna (id, titulo, previa, concluida) das lições, opcionalmente paginadas"""
+        self.cursor.execute(
+            'SELECT id, titulo, previa, concluida FROM licoes ORDER BY ordem LIMIT ? OFFSET ?',
+            (limite, deslocamento)
+        )
         return self.cursor.fetchall()
 
+    @sincronizado
+    def contar_licoes(self):
+        """Retorna (total de lições, lições concluídas)"""
+        self.cursor.execute('SELECT COUNT(*), COALESCE(SUM(concluida), 0) FROM licoes')
+        return self.cursor.fetchone()
+
+    @sincronizado
+    def obter_conteudo_licao(self, licao_id):
+        """Carrega o texto completo de uma lição quando ela é aberta"""
+        self.cursor.execute('SELECT titulo, conteudo, concluida FROM licoes WHERE id = ?', (licao_id,))
+        return self.cursor.fetchone()
+
+    @sincronizado
     def marcar_licao_concluida(self, licao_id):
         """Marca uma lição como concluída"""
         self.cursor.execute('UPDATE licoes SET concluida = 1 WHERE id = ?', (licao_id,))
+        self._registrar_alteracao()
         self.conn.commit()
 
 
+# ==================== CÁLCULOS FINANCEIROS ====================
+def validar_transacao(tipo, categoria, valor):
+    """Regras de negócio de uma transação; levanta ValueError com a mensagem do problema"""
+    if tipo not in ('receita', 'despesa'):
+        raise ValueError("tipo deve ser 'receita' ou 'despesa'")
+    categorias = CATEGORIAS_RECEITA if tipo == 'receita' else CATEGORIAS_DESPESA
+    if categoria not in categorias:
+        raise ValueError(f"categoria de {tipo} inválida: {categoria!r}")
+    if not valor > 0:
+        raise ValueError('valor deve ser positivo')
+
+
+def validar_recorrencia(frequencia, intervalo):
+    """Uma regra precisa avançar a cada ocorrência; levanta ValueError caso contrário"""
+    if frequencia not in FREQUENCIAS_VALIDAS:
+        raise ValueError(f'frequência inválida: {frequencia!r}')
+    if isinstance(intervalo, bool) or not isinstance(intervalo, int) or intervalo < 1:
+        raise ValueError('intervalo deve ser um inteiro positivo')
+
+
+def meses_do_prazo(prazo_texto):
+    """Converte a opção de prazo do simulador em número de meses"""
+    if 'Curto' in prazo_texto:
+        return 10
+    elif 'Médio' in prazo_texto:
+        return 20
+    return 40
+
+
+def calcular_ocorrencia(inicio, frequencia, intervalo, n):
+    """Data da n-ésima ocorrência (a partir de 0) de uma regra recorrente.
+
+    Nas regras mensais o dia é limitado ao fim do mês (31/01 -> 28/02 -> 31/03).
+    """
+    if frequencia == 'mensal':
+        indice_mes = inicio.month - 1 + n * intervalo
+        ano, mes = inicio.year + indice_mes // 12, indice_mes % 12 + 1
+        return date(ano, mes, min(inicio.day, calendar.monthrange(ano, mes)[1]))
+    dias = 7 * intervalo if frequencia == 'semanal' else intervalo
+    return inicio + timedelta(days=n * dias)
+
+
+def simular_investimento(valor, taxa, meses):
+    """Juros compostos: retorna (montante, rendimento) para uma taxa anual decimal"""
+    montante = valor * ((1 + taxa) ** (meses / 12))
+    return montante, montante - valor
+
+
+# Grade de sensibilidade do Plano Mestre: fatores sobre o faturamento informado
+# e custo como fração do faturamento base (o custo acompanha o volume, não o preço)
+FATORES_PRECO = (0.8, 0.9, 1.0, 1.1, 1.2)
+FATORES_VOLUME = (0.7, 0.85, 1.0, 1.15, 1.3)
+PROPORCOES_CUSTO = (0.5, 0.6, 0.7, 0.8)
+PROPORCAO_CUSTO_BASE = 0.7
+HORIZONTE_MESES = 24
+VERSAO_MODELO_CENARIOS = 1
+
+_MULTIPLICADORES = {'k': 1e3, 'mil': 1e3, 'mi': 1e6, 'milhao': 1e6, 'milhão': 1e6, 'milhoes': 1e6, 'milhões': 1e6}
+
+
+def interpretar_valor(texto):
+    """Extrai um valor em reais de uma resposta livre ('R$ 15.000,00', '15 mil', '2,5k').
+
+    Com os dois separadores, o último é o decimal ('1,500.00' e '1.500,00' valem
+    1500). Retorna None quando não há número ou o formato é ambíguo.
+    """
+    achado = re.search(r'(\d[\d.,]*)\s*(milh(?:ão|ao|ões|oes)|mil|mi|k)?\b', texto.lower())
+    if not achado:
+        return None
+    numero, sufixo = achado.group(1).rstrip('.,'), achado.group(2)
+    virgula, ponto = numero.rfind(','), numero.rfind('.')
+    if virgula >= 0 and ponto >= 0:
+        decimal, milhar = (',', '.') if virgula > ponto else ('.', ',')
+        inteiro, _, fracao = numero.rpartition(decimal)
+        if not re.fullmatch(r'\d{1,3}(%s\d{3})+' % re.escape(milhar), inteiro) or not fracao.isdigit():
+            return None
+        numero = inteiro.replace(milhar, '') + '.' + fracao
+    elif re.fullmatch(r'\d{1,3}(,\d{3}){2,}', numero):
+        numero = numero.replace(',', '')
+    elif virgula >= 0:
+        # Formato brasileiro: vírgula separa decimais
+        numero = numero.replace(',', '.')
+    elif re.fullmatch(r'\d{1,3}(\.\d{3})+', numero):
+        numero = numero.replace('.', '')
+    try:
+        valor = float(numero)
+    except ValueError:
+        return None
+    return valor * _MULTIPLICADORES.get(sufixo, 1)
+
+
+def projetar_equilibrio(investimento, faturamento, fator_preco=1.0, fator_volume=1.0,
+                        proporcao_custo=PROPORCAO_CUSTO_BASE):
+    """Retorna (lucro mensal, payback em meses ou None) de um cenário em forma fechada"""
+    lucro = faturamento * fator_volume * (fator_preco - proporcao_custo)
+    payback = investimento / lucro if lucro > 0 else None
+    return lucro, payback
+
+
+def projetar_cenarios(investimento, faturamento):
+    """Ponto de equilíbrio, fluxo de caixa acumulado e payback com grade de sensibilidade.
+
+    Cada cenário é resolvido em forma fechada (sem simular mês a mês), então a
+    grade inteira custa o mesmo que um único cálculo por ponto.
+    """
+    lucro, payback = projetar_equilibrio(investimento, faturamento)
+    base = {
+        'lucro_mensal': lucro,
+        'margem': 1 - PROPORCAO_CUSTO_BASE,
+        'payback_meses': payback,
+        'mes_equilibrio': math.ceil(payback) if payback is not None else None,
+        'fluxo_acumulado': [-investimento + lucro * mes for mes in range(HORIZONTE_MESES + 1)],
+    }
+
+    sensibilidade = []
+    for preco in FATORES_PRECO:
+        for volume in FATORES_VOLUME:
+            for custo in PROPORCOES_CUSTO:
+                lucro_cenario, payback_cenario = projetar_equilibrio(investimento, faturamento, preco, volume, custo)
+                sensibilidade.append({
+                    'preco': preco, 'volume': volume, 'custo': custo,
+                    'lucro_mensal': lucro_cenario,
+                    'mes_equilibrio': math.ceil(payback_cenario) if payback_cenario is not None else None,
+                })
+
+    viaveis = [c for c in sensibilidade
+               if c['mes_equilibrio'] is not None and c['mes_equilibrio'] <= HORIZONTE_MESES]
+    ordenados = sorted(sensibilidade, key=lambda c: -c['lucro_mensal'])
+    return {
+        'investimento': investimento,
+        'faturamento': faturamento,
+        'base': base,
+        'sensibilidade': sensibilidade,
+        'cenarios': len(sensibilidade),
+        'viaveis_no_horizonte': len(viaveis),
+        'melhor': ordenados[0],
+        'pior': ordenados[-1],
+    }
+
+
+# ==================== DIAGNÓSTICO DE DESEMPENHO ====================
+class RegistroEventos:
+    """Base dos perfiladores: acumula eventos JSON (um por linha) e os grava em lote no log"""
+
+    def __init__(self):
+        self.linhas_log = []
+        self.caminho_log = None
+
+    @staticmethod
+    def evento(tipo, precisao='milliseconds', **campos):
+        return {'evento': tipo, 'hora': datetime.now().isoformat(timespec=precisao), **campos}
+
+    def registrar(self, evento):
+        self.linhas_log.append(json.dumps(evento, ensure_ascii=False))
+
+    def resumo(self):
+        return {}
+
+    def gravar_log(self, resumo=False):
+        if resumo:
+            self.registrar(self.evento('resumo', precisao='seconds', **self.resumo()))
+        if not self.linhas_log or not self.caminho_log:
+            return
+        with open(self.caminho_log, 'a', encoding='utf-8') as arquivo:
+            arquivo.write('\n'.join(self.linhas_log) + '\n')
+        self.linhas_log = []
+
+
+class PerfiladorQuadros(RegistroEventos):
+    """Mede o tempo de cada quadro por tela e atribui os quadros lentos aos callbacks"""
+    FAIXAS_MS = (8, 16, 33, 50, 100, 250)  # limites superiores do histograma; o resto vai para '>250'
+    ORCAMENTO_MS = 1000 / 60
+
+    def __init__(self):
+        super().__init__()
+        self.ativo = False
+        self.tela_atual = '-'
+        self.histogramas = {}      # tela -> contagem por faixa
+        self.quadros = {}          # tela -> total de quadros
+        self.quadros_lentos = {}   # tela -> quadros acima do orçamento
+        self.culpados = {}         # callback -> [quadros lentos, pior tempo em ms]
+        self.callbacks_quadro = []  # (callback, ms) executados desde o último quadro
+        self.ultimo_culpado = '-'
+        self.overlay = None
+
+    def iniciar(self, caminho_log, overlay=True):
+        self.ativo = True
+        self.caminho_log = caminho_log
+        Clock.schedule_interval(self.ao_quadro, 0)
+        Clock.schedule_interval(lambda dt: self.gravar_log(), 10)
+        if overlay:
+            self.criar_overlay()
+            Clock.schedule_interval(lambda dt: self.atualizar_overlay(), 0.5)
+
+    def parar(self):
+        if self.ativo:
+            self.gravar_log(resumo=True)
+        self.ativo = False
+
+    def observar_telas(self, screen_manager):
+        self.tela_atual = screen_manager.current
+        screen_manager.bind(current=lambda inst, nome: setattr(self, 'tela_atual', nome))
+
+    def registrar_callback(self, nome, ms):
+        self.callbacks_quadro.append((nome, ms))
+
+    def ao_quadro(self, dt):
+        ms = dt * 1000
+        tela = self.tela_atual
+        histograma = self.histogramas.setdefault(tela, [0] * (len(self.FAIXAS_MS) + 1))
+        faixa = next((i for i, limite in enumerate(self.FAIXAS_MS) if ms <= limite), len(self.FAIXAS_MS))
+        histograma[faixa] += 1
+        self.quadros[tela] = self.quadros.get(tela, 0) + 1
+
+        if ms > self.ORCAMENTO_MS:
+            self.quadros_lentos[tela] = self.quadros_lentos.get(tela, 0) + 1
+            # O callback mais demorado desde o último quadro é o responsável provável
+            if self.callbacks_quadro:
+                culpado, ms_culpado = max(self.callbacks_quadro, key=lambda item: item[1])
+            else:
+                culpado, ms_culpado = '(layout/desenho)', ms
+            registro = self.culpados.setdefault(culpado, [0, 0.0])
+            registro[0] += 1
+            registro[1] = max(registro[1], ms_culpado)
+            self.ultimo_culpado = f'{culpado} {ms_culpado:.0f}ms'
+            self.registrar(self.evento(
+                'quadro_lento', tela=tela, ms=round(ms, 2), callback=culpado, callback_ms=round(ms_culpado, 2)
+            ))
+        self.callbacks_quadro = []
+
+    def resumo(self):
+        rotulos = [f'<={limite}ms' for limite in self.FAIXAS_MS] + [f'>{self.FAIXAS_MS[-1]}ms']
+        return {
+            'telas': {
+                tela: {
+                    'quadros': self.quadros.get(tela, 0),
+                    'quadros_lentos': self.quadros_lentos.get(tela, 0),
+                    'histograma': dict(zip(rotulos, contagens)),
+                }
+                for tela, contagens in self.histogramas.items()
+            },
+            'callbacks_lentos': {
+                nome: {'quadros_lentos': vezes, 'pior_ms': round(pior, 2)}
+                for nome, (vezes, pior) in sorted(self.culpados.items(), key=lambda item: -item[1][0])
+            },
+            'agendador': agendador_do_app().metricas(),
+        }
+
+    def criar_overlay(self):
+        from kivy.core.window import Window
+        self.overlay = Label(
+            size_hint=(None, None), size=(dp(260), dp(60)), font_size=dp(11),
+            color=[1, 1, 0, 1], halign='left', valign='top'
+        )
+        self.overlay.bind(size=self.overlay.setter('text_size'))
+        with self.overlay.canvas.before:
+            Color(0, 0, 0, 0.6)
+            fundo = Rectangle(pos=self.overlay.pos, size=self.overlay.size)
+        self.overlay.bind(pos=lambda inst, pos: setattr(fundo, 'pos', pos))
+
+        def posicionar(*args):
+            self.overlay.pos = (0, Window.height - self.overlay.height)
+        Window.bind(size=posicionar)
+        posicionar()
+        # No canvas.after da janela: a raiz do app é adicionada depois do build() e,
+        # no canvas normal, seria desenhada por cima do overlay
+        Window.add_widget(self.overlay, canvas='after')
+
+    def atualizar_overlay(self):
+        tela = self.tela_atual
+        self.overlay.text = (
+            f'[{tela}] quadros: {self.quadros.get(tela, 0)}  '
+            f'lentos: {self.quadros_lentos.get(tela, 0)}\n'
+            f'último: {self.ultimo_culpado}  fila: {agendador_do_app().metricas()["profundidade_fila"]}'
+        )
+
+
+perfilador = PerfiladorQuadros()
+
+
+def perfilar(funcao):
+    """Registra a duração do callback no perfilador; custo desprezível quando desativado"""
+    nome = funcao.__qualname__
+
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        if not perfilador.ativo:
+            return funcao(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            perfilador.registrar_callback(nome, (time.perf_counter() - inicio) * 1000)
+    return envolvida
+
+
+class PerfiladorMemoria(RegistroEventos):
+    """Mede a memória por tela e aponta widgets que sobrevivem a um clear_widgets()"""
+    PRAZO_DESCARTE_S = 2  # tempo para o Clock e as animações soltarem a subárvore descartada
+    QUADROS_PILHA = 10
+    MAIORES_CRESCIMENTOS = 5
+
+    def __init__(self):
+        super().__init__()
+        self.ativo = False
+        self.medicoes = {}         # tela -> última medição ao entrar nela
+        self.instantaneos = {}     # tela -> último tracemalloc.Snapshot
+        self.descartes = []        # (origem, momento, container, [(ref, ref_dono)]) a conferir
+        self.ciclos = {}           # origem -> descartes conferidos
+        self.retidos = {}          # origem -> (container, [(ref, ref_dono)]) que seguem vivos
+        self.pico_retidos = {}     # origem -> maior quantidade de retidos já vista
+        self.eventos_clock = []
+        self.iniciou_tracemalloc = False
+
+    def iniciar(self, caminho_log=None, quadros=QUADROS_PILHA):
+        self.ativo = True
+        self.caminho_log = caminho_log
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(quadros)
+            self.iniciou_tracemalloc = True
+        self.eventos_clock = [
+            Clock.schedule_interval(self.conferir_descartes, self.PRAZO_DESCARTE_S),
+            Clock.schedule_interval(lambda dt: self.gravar_log(), 10),
+        ]
+
+    def parar(self):
+        if not self.ativo:
+            return
+        for evento in self.eventos_clock:
+            evento.cancel()
+        self.descartes = []
+        self.gravar_log(resumo=True)
+        self.retidos = {}
+        if self.iniciou_tracemalloc:
+            tracemalloc.stop()
+            self.iniciou_tracemalloc = False
+        self.instantaneos = {}
+        self.ativo = False
+
+    def observar_telas(self, screen_manager):
+        screen_manager.bind(current=lambda inst, nome: self.medir_tela(nome))
+
+    @staticmethod
+    def contar_vivos():
+        """Widgets e instruções de canvas vivos, por classe"""
+        widgets, instrucoes = collections.Counter(), collections.Counter()
+        for objeto in gc.get_objects():
+            # type() em vez de isinstance(): um WeakProxy morto do Kivy levanta ReferenceError
+            classe = type(objeto)
+            if issubclass(classe, Widget):
+                widgets[classe.__name__] += 1
+            elif issubclass(classe, Instruction):
+                instrucoes[classe.__name__] += 1
+        return widgets, instrucoes
+
+    def medir_tela(self, tela):
+        """Mede ao entrar na tela e compara com a visita anterior à mesma tela"""
+        gc.collect()
+        widgets, instrucoes = self.contar_vivos()
+        medicao = {'widgets': sum(widgets.values()), 'instrucoes': sum(instrucoes.values())}
+        evento = self.evento(
+            'tela', tela=tela, **medicao,
+            widgets_por_classe=dict(widgets.most_common(10)),
+            instrucoes_por_classe=dict(instrucoes.most_common(10)),
+        )
+        anterior = self.medicoes.get(tela)
+        if anterior:
+            evento['delta_widgets'] = medicao['widgets'] - anterior['widgets']
+            evento['delta_instrucoes'] = medicao['instrucoes'] - anterior['instrucoes']
+
+        if tracemalloc.is_tracing():
+            atual, pico = tracemalloc.get_traced_memory()
+            medicao['memoria_kb'] = evento['memoria_kb'] = round(atual / 1024, 1)
+            evento['pico_kb'] = round(pico / 1024, 1)
+            instantaneo = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            if tela in self.instantaneos:
+                diferencas = instantaneo.compare_to(self.instantaneos[tela], 'lineno')
+                evento['crescimento'] = [
+                    {'linha': str(stat.traceback[0]), 'kb': round(stat.size_diff / 1024, 1),
+                     'blocos': stat.count_diff}
+                    for stat in diferencas if stat.size_diff > 0
+                ][:self.MAIORES_CRESCIMENTOS]
+            self.instantaneos[tela] = instantaneo
+
+        self.medicoes[tela] = medicao
+        self.registrar(evento)
+        return evento
+
+    def vigiar_descarte(self, container, origem):
+        """Guarda referências fracas da subárvore que o clear_widgets() vai descartar"""
+        refs = []
+        for filho in container.children:
+            for widget in filho.walk(restrict=True):
+                ref_widget = weakref.ref(widget)
+                refs.append((ref_widget, ref_widget))
+                canvas = widget.canvas
+                grupos = [canvas.children]
+                if canvas.has_before:
+                    grupos.append(canvas.before.children)
+                if canvas.has_after:
+                    grupos.append(canvas.after.children)
+                refs.extend((weakref.ref(instrucao), ref_widget) for grupo in grupos for instrucao in grupo)
+        if refs:
+            self.descartes.append((origem, time.monotonic(), weakref.ref(container), refs))
+
+    def conferir_descartes(self, dt=None, prazo=None):
+        """Coleta o lixo e acompanha o que sobreviveu aos descartes mais velhos que o prazo.
+
+        O Kivy segura por um tempo alguns widgets recém-descartados (o último TextInput
+        criado, por exemplo), então só o crescimento dos retidos de uma origem é aviso
+        de vazamento. Retorna origem -> Counter das classes retidas que seguem vivas.
+        """
+        limite = time.monotonic() - (self.PRAZO_DESCARTE_S if prazo is None else prazo)
+        vencidos = [descarte for descarte in self.descartes if descarte[1] <= limite]
+        self.descartes = [descarte for descarte in self.descartes if descarte[1] > limite]
+        gc.collect()
+
+        for origem, _, ref_container, refs in vencidos:
+            self.ciclos[origem] = self.ciclos.get(origem, 0) + 1
+            self.retidos.setdefault(origem, (ref_container, []))[1].extend(refs)
+
+        vivos = {}
+        for origem, (ref_container, refs) in self.retidos.items():
+            container = ref_container()
+            refs[:] = [
+                (ref, ref_dono) for ref, ref_dono in refs
+                if ref() is not None and not _reaproveitado(ref_dono(), container)
+            ]
+            vivos[origem] = collections.Counter(type(ref()).__name__ for ref, _ in refs)
+            if len(refs) > self.pico_retidos.get(origem, 0):
+                self.pico_retidos[origem] = len(refs)
+                Logger.warning(f'Memoria: {len(refs)} objetos descartados por {origem} seguem vivos')
+                self.registrar(self.evento(
+                    'retidos', origem=origem, retidos=len(refs), por_classe=dict(vivos[origem])
+                ))
+        return {origem: contagem for origem, contagem in vivos.items() if contagem}
+
+    def resumo(self):
+        return {
+            'telas': self.medicoes,
+            'descartes': {
+                origem: {
+                    'ciclos': ciclos,
+                    'retidos': len(self.retidos[origem][1]) if origem in self.retidos else 0,
+                    'pico_retidos': self.pico_retidos.get(origem, 0),
+                }
+                for origem, ciclos in sorted(self.ciclos.items())
+            },
+        }
+
+
+def _reaproveitado(widget, container):
+    """Um widget descartado que voltou para o mesmo container não é vazamento"""
+    while widget is not None:
+        if widget is container:
+            return True
+        widget = widget.parent
+    return False
+
+
+memoria = PerfiladorMemoria()
+
+
+def limpar_widgets(container, origem):
+    """clear_widgets() que, com a instrumentação ativa, confere se a subárvore foi liberada"""
+    if memoria.ativo:
+        memoria.vigiar_descarte(container, origem)
+    container.clear_widgets()
+
+
+# ==================== TAREFAS EM SEGUNDO PLANO ====================
+# Threads de trabalho do agendador e processos para simulações pesadas (0 = desligado;
+# o Android não suporta multiprocessing, por isso o padrão é 0)
+TRABALHADORES_AGENDADOR = int(os.environ.get('RIQUEZA_TRABALHADORES', '2'))
+PROCESSOS_AGENDADOR = int(os.environ.get('RIQUEZA_PROCESSOS', '0'))
+PRIORIDADE_ALTA, PRIORIDADE_NORMAL, PRIORIDADE_BAIXA = 0, 5, 10
+
+
+def percentil(amostras, p):
+    """Percentil pelo método nearest-rank sobre amostras já ordenadas"""
+    indice = max(0, min(len(amostras) - 1, math.ceil(p / 100 * len(amostras)) - 1))
+    return amostras[indice]
+
+
+class Tarefa:
+    """Unidade de trabalho enviada ao agendador"""
+
+    def __init__(self, funcao, args, kwargs, prioridade, chave, processo, ao_concluir, ao_falhar,
+                 essencial=False):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.prioridade = prioridade
+        self.chave = chave
+        self.processo = processo
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.essencial = essencial
+        self.cancelada = False
+        self.iniciada = False
+        self.enviada_em = time.perf_counter()
+
+    def mesma_chamada(self, funcao, args, kwargs):
+        return self.funcao == funcao and self.args == args and self.kwargs == kwargs
+
+    def cancelar(self):
+        """Descarta a tarefa; se já estiver rodando, seu resultado não é entregue"""
+        self.cancelada = True
+
+
+class AgendadorTarefas:
+    """Fila de prioridades atendida por um pool de threads (e opcionalmente de processos).
+
+    Tarefas com a mesma `chave` se substituem: a mais nova cancela as anteriores,
+    e um reenvio idêntico enquanto a original está pendente é deduplicado. Os
+    resultados são entregues na thread principal via Clock.schedule_once. Com
+    zero trabalhadores tudo roda na hora, na thread chamadora (útil fora do app).
+    Tarefas `essencial=True` (gravações) ainda rodam durante o encerramento.
+    """
+    AMOSTRAS_METRICAS = 500
+    TEMPO_ENCERRAMENTO_S = 10
+
+    def __init__(self, trabalhadores=TRABALHADORES_AGENDADOR, processos=PROCESSOS_AGENDADOR):
+        self.fila = []  # heap de (prioridade, sequência, tarefa)
+        self.condicao = threading.Condition()
+        self.sequencia = itertools.count()
+        self.por_chave = {}
+        self.em_execucao = 0
+        self.executando = set()
+        self.ativo = True
+        self.esperas_ms = collections.deque(maxlen=self.AMOSTRAS_METRICAS)
+        self.execucoes_ms = collections.deque(maxlen=self.AMOSTRAS_METRICAS)
+        self.contadores = {'concluidas': 0, 'falhas': 0, 'canceladas': 0, 'deduplicadas': 0}
+        self.pool_processos = None
+        if processos:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool_processos = ProcessPoolExecutor(processos)
+        self.threads = [
+            threading.Thread(target=self._trabalhar, name=f'agendador-{i}', daemon=True)
+            for i in range(trabalhadores)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def enviar(self, funcao, *args, prioridade=PRIORIDADE_NORMAL, chave=None, processo=False,
+               ao_concluir=None, ao_falhar=None, essencial=False, **kwargs):
+        """Agenda `funcao(*args, **kwargs)` e retorna a Tarefa.
+
+        `processo=True` roda a função no pool de processos, quando configurado;
+        ela e seus argumentos precisam então ser serializáveis (pickle). Depois
+        de encerrar() nada mais é aceito: a tarefa volta já cancelada.
+        """
+        with self.condicao:
+            if not self.ativo:
+                tarefa = Tarefa(funcao, args, kwargs, prioridade, chave, processo, None, None)
+                tarefa.cancelar()
+                return tarefa
+            anterior = self.por_chave.get(chave) if chave is not None else None
+            if anterior is not None and not anterior.cancelada:
+                if not anterior.iniciada and anterior.mesma_chamada(funcao, args, kwargs):
+                    self.contadores['deduplicadas'] += 1
+                    anterior.ao_concluir, anterior.ao_falhar = ao_concluir, ao_falhar
+                    return anterior
+                anterior.cancelar()
+                self.contadores['canceladas'] += 1
+            tarefa = Tarefa(funcao, args, kwargs, prioridade, chave, processo, ao_concluir, ao_falhar, essencial)
+            if chave is not None:
+                self.por_chave[chave] = tarefa
+            if self.threads:
+                heapq.heappush(self.fila, (prioridade, next(self.sequencia), tarefa))
+                self.condicao.notify()
+                return tarefa
+        self._executar(tarefa)
+        return tarefa
+
+    def cancelar(self, chave):
+        """Cancela a tarefa pendente ou em execução associada à chave"""
+        with self.condicao:
+            tarefa = self.por_chave.pop(chave, None)
+            if tarefa is not None and not tarefa.cancelada:
+                tarefa.cancelar()
+                self.contadores['canceladas'] += 1
+
+    def encerrar(self, tempo_limite=TEMPO_ENCERRAMENTO_S):
+        """Para de aceitar tarefas, descarta as dispensáveis e espera as essenciais terminarem"""
+        with self.condicao:
+            self.ativo = False
+            for _, _, tarefa in self.fila:
+                if not tarefa.essencial:
+                    tarefa.cancelar()
+            for tarefa in self.executando:
+                if not tarefa.essencial:
+                    tarefa.cancelar()
+            self.fila = [item for item in self.fila if not item[2].cancelada]
+            heapq.heapify(self.fila)
+            self.condicao.notify_all()
+        prazo = time.monotonic() + tempo_limite
+        for thread in self.threads:
+            thread.join(max(0, prazo - time.monotonic()))
+            if thread.is_alive():
+                Logger.warning(f'Agendador: {thread.name} ainda em execução após {tempo_limite}s')
+        if self.pool_processos:
+            self.pool_processos.shutdown(wait=False)
+
+    def metricas(self):
+        """Profundidade da fila, contadores e latências (espera e execução) em ms"""
+        with self.condicao:
+            resultado = dict(self.contadores, profundidade_fila=len(self.fila), em_execucao=self.em_execucao)
+            amostras = {'espera': sorted(self.esperas_ms), 'execucao': sorted(self.execucoes_ms)}
+        for nome, valores in amostras.items():
+            resultado[f'{nome}_p50_ms'] = round(percentil(valores, 50), 2) if valores else 0
+            resultado[f'{nome}_p99_ms'] = round(percentil(valores, 99), 2) if valores else 0
+        return resultado
+
+    def _trabalhar(self):
+        while True:
+            with self.condicao:
+                while self.ativo and not self.fila:
+                    self.condicao.wait()
+                if not self.fila:
+                    return  # encerrado e sem tarefas essenciais pendentes
+                _, _, tarefa = heapq.heappop(self.fila)
+                if tarefa.cancelada:
+                    continue
+                tarefa.iniciada = True
+                self.em_execucao += 1
+                self.executando.add(tarefa)
+            try:
+                self._executar(tarefa)
+            finally:
+                with self.condicao:
+                    self.em_execucao -= 1
+                    self.executando.discard(tarefa)
+
+    def _executar(self, tarefa):
+        tarefa.iniciada = True
+        inicio = time.perf_counter()
+        try:
+            if tarefa.processo and self.pool_processos:
+                resultado = self.pool_processos.submit(tarefa.funcao, *tarefa.args, **tarefa.kwargs).result()
+            else:
+                resultado = tarefa.funcao(*tarefa.args, **tarefa.kwargs)
+        except Exception as erro:  # a falha é entregue ao chamador, não derruba o trabalhador
+            self._registrar(tarefa, inicio, 'falhas')
+            self._entregar(tarefa, tarefa.ao_falhar, erro)
+        else:
+            self._registrar(tarefa, inicio, 'concluidas')
+            self._entregar(tarefa, tarefa.ao_concluir, resultado)
+
+    def _registrar(self, tarefa, inicio, contador):
+        with self.condicao:
+            self.esperas_ms.append((inicio - tarefa.enviada_em) * 1000)
+            self.execucoes_ms.append((time.perf_counter() - inicio) * 1000)
+            self.contadores[contador] += 1
+            if tarefa.chave is not None and self.por_chave.get(tarefa.chave) is tarefa:
+                del self.por_chave[tarefa.chave]
+
+    def _entregar(self, tarefa, callback, valor):
+        if callback is None or tarefa.cancelada:
+            return
+        if not self.threads:
+            callback(valor)
+            return
+
+        def entregar(dt):
+            # Pode ter sido substituída enquanto aguardava o próximo quadro
+            if not tarefa.cancelada:
+                callback(valor)
+        Clock.schedule_once(entregar)
+
+
+_agendador_local = None
+
+
+def agendador_do_app():
+    """Agendador do app em execução; fora dele, um agendador síncrono"""
+    global _agendador_local
+    app = App.get_running_app()
+    if app is not None and getattr(app, 'agendador', None) is not None:
+        return app.agendador
+    if _agendador_local is None:
+        _agendador_local = AgendadorTarefas(trabalhadores=0, processos=0)
+    return _agendador_local
+
+
+# ==================== RELATÓRIOS PDF ====================
+# Larguras da Helvetica (unidades de 1/1000 do corpo) para os caracteres ASCII 32..126
+_LARGURAS_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+LARGURA_PAGINA, ALTURA_PAGINA, MARGEM_PAGINA = 595, 842, 50  # A4 em pontos
+# estilo -> (fonte, corpo, entrelinha)
+ESTILOS_PDF = {
+    'titulo': ('F2', 16, 24),
+    'secao': ('F2', 12, 20),
+    'texto': ('F1', 10, 14),
+    'tabela': ('F1', 9, 13),
+}
+_MODELOS_PAGINA = {}
+
+
+@functools.lru_cache(maxsize=4096)
+def largura_texto(texto, corpo):
+    """Largura aproximada de `texto` em pontos na Helvetica"""
+    total = 0
+    for caractere in texto:
+        codigo = ord(caractere)
+        total += _LARGURAS_HELVETICA[codigo - 32] if 32 <= codigo <= 126 else 556
+    return total * corpo / 1000
+
+
+def _texto_pdf(texto):
+    """Codifica em WinAnsi (descartando emojis) e escapa para uma string PDF"""
+    bruto = texto.encode('cp1252', errors='ignore').strip()
+    return bruto.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def quebrar_linhas(texto, corpo, largura):
+    """Quebra o texto em linhas que cabem na largura, por palavras"""
+    linhas = []
+    for paragrafo in texto.split('\n'):
+        atual = ''
+        for palavra in paragrafo.split():
+            candidata = f'{atual} {palavra}' if atual else palavra
+            if atual and largura_texto(candidata, corpo) > largura:
+                linhas.append(atual)
+                atual = palavra
+            else:
+                atual = candidata
+        linhas.append(atual)
+    return linhas
+
+
+def modelo_pagina(titulo):
+    """Cabeçalho e rodapé pré-compilados por título, reaproveitados entre execuções"""
+    if titulo not in _MODELOS_PAGINA:
+        topo = ALTURA_PAGINA - MARGEM_PAGINA + 20
+        _MODELOS_PAGINA[titulo] = (
+            b'0.85 0.65 0.13 rg %d %d %d 2 re f\n' % (MARGEM_PAGINA, topo - 6, LARGURA_PAGINA - 2 * MARGEM_PAGINA)
+            + b'0.05 0.13 0.25 rg BT /F2 9 Tf %d %d Td (%s) Tj ET\n' % (MARGEM_PAGINA, topo, _texto_pdf(
+                f'Riqueza Babilônica - {titulo}'))
+            + b'0.4 0.4 0.4 rg BT /F1 8 Tf %d %d Td (%s ' % (MARGEM_PAGINA, MARGEM_PAGINA - 25, _texto_pdf('Página'))
+        )
+    return _MODELOS_PAGINA[titulo]
+
+
+class EscritorPDF:
+    """Escreve um PDF página a página direto no arquivo, com memória constante.
+
+    Objetos 1-4 (catálogo, árvore de páginas e fontes) são reservados e gravados
+    no fechamento; cada página é gravada assim que fica pronta.
+    """
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, 'wb')
+        self.deslocamentos = {}
+        self.paginas = []
+        self.proximo_objeto = 5
+        self.arquivo.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _gravar_objeto(self, numero, corpo):
+        self.deslocamentos[numero] = self.arquivo.tell()
+        self.arquivo.write(b'%d 0 obj\n' % numero + corpo + b'\nendobj\n')
+
+    def adicionar_pagina(self, conteudo):
+        fluxo = zlib.compress(conteudo)
+        numero_conteudo, numero_pagina = self.proximo_objeto, self.proximo_objeto + 1
+        self.proximo_objeto += 2
+        self._gravar_objeto(
+            numero_conteudo,
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(fluxo) + fluxo + b'\nendstream'
+        )
+        self._gravar_objeto(numero_pagina, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+        ) % (LARGURA_PAGINA, ALTURA_PAGINA, numero_conteudo))
+        self.paginas.append(numero_pagina)
+
+    def fechar(self):
+        self._gravar_objeto(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        filhos = b' '.join(b'%d 0 R' % numero for numero in self.paginas)
+        self._gravar_objeto(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (filhos, len(self.paginas)))
+        for numero, fonte in ((3, b'Helvetica'), (4, b'Helvetica-Bold')):
+            self._gravar_objeto(
+                numero, b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % fonte
+            )
+        inicio_xref = self.arquivo.tell()
+        self.arquivo.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.proximo_objeto)
+        for numero in range(1, self.proximo_objeto):
+            self.arquivo.write(b'%010d 00000 n \n' % self.deslocamentos[numero])
+        self.arquivo.write(
+            b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.proximo_objeto, inicio_xref)
+        )
+        self.arquivo.close()
+
+
+def renderizar_relatorio(caminho, titulo, blocos, ao_progresso=None, cancelado=None):
+    """Diagrama os blocos (estilo, conteúdo) em páginas A4 e as grava à medida que enchem.
+
+    Estilos: 'titulo', 'secao' e 'texto' recebem uma string; 'tabela' recebe
+    (data, categoria, descrição, valor). O pseudo-bloco ('progresso', fração)
+    repassa o avanço da fonte de dados para `ao_progresso(páginas, fração)`.
+    As páginas vão para um arquivo parcial que só substitui `caminho` no fim;
+    se `cancelado()` ficar verdadeiro entre blocos, ele é apagado e o retorno
+    é None. Retorna o número de páginas geradas.
+    """
+    parcial = f'{caminho}.{threading.get_ident()}.parcial'
+    escritor = EscritorPDF(parcial)
+    concluido = False
+    cabecalho = modelo_pagina(titulo)
+    largura_util = LARGURA_PAGINA - 2 * MARGEM_PAGINA
+    colunas_tabela = (MARGEM_PAGINA, MARGEM_PAGINA + 65, MARGEM_PAGINA + 165)
+    pagina, y = [], 0
+
+    def fechar_pagina():
+        numero = len(escritor.paginas) + 1
+        escritor.adicionar_pagina(cabecalho + b'%d) Tj ET\n' % numero + b''.join(pagina))
+
+    try:
+        for estilo, conteudo in blocos:
+            if cancelado and cancelado():
+                return None
+            if estilo == 'progresso':
+                if ao_progresso:
+                    ao_progresso(len(escritor.paginas), conteudo)
+                continue
+            fonte, corpo, entrelinha = ESTILOS_PDF[estilo]
+            if estilo == 'tabela':
+                *textos, valor = conteudo
+                linhas = [None]
+            else:
+                linhas = quebrar_linhas(conteudo, corpo, largura_util)
+            for linha in linhas:
+                if not pagina or y - entrelinha < MARGEM_PAGINA:
+                    if pagina:
+                        fechar_pagina()
+                    pagina, y = [b'0.05 0.13 0.25 rg\n'], ALTURA_PAGINA - MARGEM_PAGINA - 10
+                y -= entrelinha
+                if linha is None:
+                    for x, texto in zip(colunas_tabela, textos):
+                        pagina.append(b'BT /%s %d Tf %d %d Td (%s) Tj ET\n' % (
+                            fonte.encode(), corpo, x, y, _texto_pdf(texto)))
+                    x_valor = LARGURA_PAGINA - MARGEM_PAGINA - largura_texto(valor, corpo)
+                    pagina.append(b'BT /%s %d Tf %.1f %d Td (%s) Tj ET\n' % (
+                        fonte.encode(), corpo, x_valor, y, _texto_pdf(valor)))
+                else:
+                    pagina.append(b'BT /%s %d Tf %d %d Td (%s) Tj ET\n' % (
+                        fonte.encode(), corpo, MARGEM_PAGINA, y, _texto_pdf(linha)))
+        if pagina or not escritor.paginas:
+            fechar_pagina()
+        concluido = True
+    finally:
+        escritor.fechar()
+        if concluido:
+            os.replace(parcial, caminho)
+        else:
+            os.remove(parcial)
+    if ao_progresso:
+        ao_progresso(len(escritor.paginas), 1.0)
+    return len(escritor.paginas)
+
+
+def blocos_extrato(db, inicio, fim):
+    """Blocos do extrato do período, lidos do banco em lotes e agrupados por mês"""
+    total = db.contar_transacoes(inicio, fim) or 1
+    yield 'titulo', f'Extrato de {inicio} a {fim}'
+    mes_atual, receitas, despesas, lidas = None, 0, 0, 0
+    for lote in db.iterar_transacoes(inicio, fim):
+        for tipo, categoria, valor, descricao, data in lote:
+            if data[:7] != mes_atual:
+                if mes_atual:
+                    yield from _blocos_total_mes(receitas, despesas)
+                mes_atual, receitas, despesas = data[:7], 0, 0
+                yield 'secao', f'Mês {mes_atual}'
+            if tipo == 'receita':
+                receitas += valor
+            else:
+                despesas += valor
+            sinal = '+' if tipo == 'receita' else '-'
+            yield 'tabela', (data, categoria, (descricao or '')[:40], f'{sinal} R$ {valor:,.2f}')
+        lidas += len(lote)
+        yield 'progresso', lidas / total
+    if mes_atual:
+        yield from _blocos_total_mes(receitas, despesas)
+    else:
+        yield 'texto', 'Nenhuma transação no período.'
+
+
+def _blocos_total_mes(receitas, despesas):
+    yield 'texto', f'Receitas: R$ {receitas:,.2f}   Despesas: R$ {despesas:,.2f}   Saldo: R$ {receitas - despesas:,.2f}'
+
+
+def blocos_plano(respostas, perguntas, cenarios_texto):
+    """Blocos do plano de negócios gerado pelo Plano Mestre"""
+    yield 'titulo', 'Plano de Negócios'
+    for indice, pergunta in enumerate(perguntas):
+        yield 'secao', pergunta['titulo']
+        yield 'texto', respostas.get(indice, 'Não informado')
+    yield 'secao', 'Ponto de Equilíbrio'
+    yield 'texto', cenarios_texto
+
+
+def exportar_em_segundo_plano(caminho, titulo, blocos, ao_progresso, ao_concluir):
+    """Gera o relatório no agendador e entrega progresso e resultado na thread principal.
+
+    `ao_concluir` recebe (caminho, páginas) no sucesso ou (None, erro) na falha.
+    Um novo pedido para o mesmo arquivo substitui o anterior: a renderização
+    antiga para no próximo bloco, mesmo se já tiver começado.
+    """
+    tarefa = None
+
+    def progresso(paginas, fracao):
+        Clock.schedule_once(lambda dt: ao_progresso(paginas, fracao))
+
+    def cancelado():
+        return tarefa is not None and tarefa.cancelada
+
+    tarefa = agendador_do_app().enviar(
+        renderizar_relatorio, caminho, titulo, blocos, progresso, cancelado,
+        prioridade=PRIORIDADE_BAIXA, chave=('relatorio', caminho),
+        ao_concluir=lambda paginas: ao_concluir(caminho, paginas),
+        ao_falhar=lambda erro: ao_concluir(None, erro)
+    )
+
+
+def pasta_relatorios():
+    """Pasta dos PDFs gerados: Download/ no Android, dados do app (ou o diretório atual fora dele) no resto.
+
+    No Android o user_data_dir é privado do app: o usuário não conseguiria abrir nem compartilhar o PDF.
+    """
+    if platform == 'android':
+        from android.storage import primary_external_storage_path
+        pasta = os.path.join(primary_external_storage_path(), 'Download', 'RiquezaBabilonica')
+        try:
+            os.makedirs(pasta, exist_ok=True)
+            return pasta
+        except OSError as erro:  # permissão negada: ainda gera o PDF, só que na pasta privada
+            Logger.warning(f'Relatorios: sem acesso a {pasta}: {erro!r}')
+    app = App.get_running_app()
+    return app.user_data_dir if app else os.getcwd()
+
+
+# ==================== INSTANTÂNEO DO PAINEL ====================
+class InstantaneoPainel:
+    """Último estado do painel gravado em disco para pintar as telas antes do banco responder.
+
+    O instantâneo guarda a identidade do banco e a versão (contador de alterações) de
+    quando foi gerado; comparar os dois com o banco aberto basta para saber se está velho.
+    """
+    FORMATO = 2
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.trava = threading.Lock()
+        self.dados = self.carregar()
+
+    def carregar(self):
+        try:
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(dados, dict) or dados.get('formato') != self.FORMATO:
+            return None
+        return dados
+
+    def atual(self, banco, versao):
+        """Indica se o instantâneo corresponde a este banco, à sua versão e ao mês corrente"""
+        return (self.dados is not None and self.dados['banco'] == banco and self.dados['versao'] == versao
+                and self.dados['mes'] == datetime.now().strftime('%Y-%m'))
+
+    def salvar(self, dados):
+        with self.trava:
+            self.dados = dict(dados, formato=self.FORMATO)
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(self.dados, arquivo, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+
+
+def painel_do_app():
+    """Dados do instantâneo carregado pelo app, ou None (primeira execução ou fora do app)"""
+    app = App.get_running_app()
+    painel = getattr(app, 'painel', None) if app is not None else None
+    return painel.dados if painel is not None else None
+
+
 # ==================== CORES E TEMA ====================
 class Cores:
     """Paleta de cores do tema Babilônia"""
@@ -243,25 +1734,79 @@ class TelaPrincipia(Screen):
         header.add_widget(titulo)
         layout.add_widget(header)
 
-        # ScrollView com lições
-        scroll = ScrollView()
-        licoes_layout = BoxLayout(orientation='vertical', spacing=dp(15), size_hint_y=None, padding=dp(10))
-        licoes_layout.bind(minimum_height=licoes_layout.setter('height'))
+        self.progresso_label = Label(
+            text='', font_size=dp(14), color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(25)
+        )
+        layout.add_widget(self.progresso_label)
+        dados = painel_do_app()
+        if dados:
+            self.exibir_progresso(dados['licoes_concluidas'], dados['licoes_total'])
+        else:
+            agendador_do_app().enviar(
+                self.db.contar_licoes, prioridade=PRIORIDADE_ALTA,
+                ao_concluir=lambda contagem: self.exibir_progresso(*reversed(contagem))
+            )
 
-        licoes = self.db.obter_licoes()
-        for licao_id, titulo_licao, conteudo, concluida in licoes:
-            cartao = self.criar_cartao_licao(licao_id, titulo_licao, conteudo, concluida)
-            licoes_layout.add_widget(cartao)
+        # ScrollView com uma página de lições por vez
+        self.scroll = ScrollView()
+        self.licoes_layout = BoxLayout(orientation='vertical', spacing=dp(15), size_hint_y=None, padding=dp(10))
+        self.licoes_layout.bind(minimum_height=self.licoes_layout.setter('height'))
+        self.pagina = 0
+        self.mostrar_pagina(0)
 
-        scroll.add_widget(licoes_layout)
-        layout.add_widget(scroll)
+        self.scroll.add_widget(self.licoes_layout)
+        layout.add_widget(self.scroll)
         self.add_widget(layout)
 
     def atualizar_header(self, instance, value):
         self.header_rect.pos = instance.pos
         self.header_rect.size = instance.size
 
-    def criar_cartao_licao(self, licao_id, titulo, conteudo, concluida):
+    def exibir_progresso(self, concluidas, total):
+        self.progresso_label.text = f'📜 {concluidas} de {total} lições concluídas'
+
+    def aplicar_painel(self, dados):
+        self.exibir_progresso(dados['licoes_concluidas'], dados['licoes_total'])
+
+    def mostrar_pagina(self, pagina):
+        # Mesma chave de abrir_licao: a última navegação pedida é a que aparece
+        agendador_do_app().enviar(
+            self.ler_pagina, pagina, prioridade=PRIORIDADE_ALTA, chave='principia_conteudo',
+            ao_concluir=lambda resultado: self.exibir_pagina(*resultado)
+        )
+
+    def ler_pagina(self, pagina):
+        """Roda no agendador: limita a página ao total e lê as lições dela"""
+        total = self.db.contar_licoes()[0]
+        paginas = max(1, -(-total // LICOES_POR_PAGINA))
+        pagina = max(0, min(pagina, paginas - 1))
+        return pagina, paginas, self.db.obter_licoes(LICOES_POR_PAGINA, pagina * LICOES_POR_PAGINA)
+
+    @perfilar
+    def exibir_pagina(self, pagina, paginas, licoes):
+        self.pagina = pagina
+        limpar_widgets(self.licoes_layout, 'TelaPrincipia.exibir_pagina')
+        for licao_id, titulo_licao, previa, concluida in licoes:
+            cartao = self.criar_cartao_licao(licao_id, titulo_licao, previa, concluida)
+            self.licoes_layout.add_widget(cartao)
+
+        if paginas > 1:
+            navegacao = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(50))
+            btn_anterior = Button(
+                text='← Anteriores', background_color=[0.5, 0.5, 0.5, 1], disabled=self.pagina == 0
+            )
+            btn_anterior.bind(on_press=lambda x: self.mostrar_pagina(self.pagina - 1))
+            navegacao.add_widget(btn_anterior)
+            navegacao.add_widget(Label(text=f'{self.pagina + 1} de {paginas}', color=Cores.AZUL_ESCURO))
+            btn_proxima = Button(
+                text='Próximas →', background_color=[0.5, 0.5, 0.5, 1], disabled=self.pagina == paginas - 1
+            )
+            btn_proxima.bind(on_press=lambda x: self.mostrar_pagina(self.pagina + 1))
+            navegacao.add_widget(btn_proxima)
+            self.licoes_layout.add_widget(navegacao)
+        self.scroll.scroll_y = 1
+
+    def criar_cartao_licao(self, licao_id, titulo, previa, concluida):
         cartao = CartaoElegante()
         cartao.height = dp(200)
 
@@ -273,7 +1818,7 @@ class TelaPrincipia(Screen):
         cartao.add_widget(titulo_label)
 
         conteudo_label = Label(
-            text=conteudo[:150] + '...',
+            text=previa + '...',
             font_size=dp(14), color=[0.3, 0.3, 0.3, 1], halign='left', valign='top'
         )
         conteudo_label.bind(size=conteudo_label.setter('text_size'))
@@ -281,19 +1826,66 @@ class TelaPrincipia(Screen):
 
         if concluida:
             botao = Button(
-                text='✓ Concluída', background_color=Cores.VERDE,
-                size_hint_y=None, height=dp(40), disabled=True
+                text='✓ Concluída · Reler', background_color=Cores.VERDE,
+                size_hint_y=None, height=dp(40)
             )
         else:
             botao = BotaoDourado(text='Estudar Lição')
-            botao.bind(on_press=lambda x: self.marcar_concluida(licao_id, cartao))
+        botao.bind(on_press=lambda x: self.abrir_licao(licao_id))
         cartao.add_widget(botao)
         return cartao
 
-    def marcar_concluida(self, licao_id, cartao):
-        self.db.marcar_licao_concluida(licao_id)
+    def abrir_licao(self, licao_id):
+        agendador_do_app().enviar(
+            self.db.obter_conteudo_licao, licao_id, prioridade=PRIORIDADE_ALTA, chave='principia_conteudo',
+            ao_concluir=lambda licao: self.exibir_licao(licao_id, *licao)
+        )
+
+    @perfilar
+    def exibir_licao(self, licao_id, titulo, conteudo, concluida):
+        limpar_widgets(self.licoes_layout, 'TelaPrincipia.exibir_licao')
+
+        titulo_label = Label(
+            text=titulo, font_size=dp(20), bold=True, color=Cores.AZUL_ESCURO,
+            size_hint_y=None, height=dp(40), halign='left', valign='middle'
+        )
+        titulo_label.bind(size=titulo_label.setter('text_size'))
+        self.licoes_layout.add_widget(titulo_label)
+
+        conteudo_label = Label(
+            text=conteudo, font_size=dp(15), color=[0.2, 0.2, 0.2, 1],
+            size_hint_y=None, halign='left', valign='top'
+        )
+        conteudo_label.bind(
+            width=lambda inst, largura: setattr(inst, 'text_size', (largura, None)),
+            texture_size=lambda inst, tamanho: setattr(inst, 'height', tamanho[1])
+        )
+        self.licoes_layout.add_widget(conteudo_label)
+
+        botoes = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(50))
+        btn_voltar = Button(text='← Voltar', background_color=[0.5, 0.5, 0.5, 1])
+        btn_voltar.bind(on_press=lambda x: self.mostrar_pagina(self.pagina))
+        botoes.add_widget(btn_voltar)
+        if concluida:
+            btn_concluir = Button(text='✓ Concluída', background_color=Cores.VERDE, disabled=True)
+        else:
+            btn_concluir = BotaoDourado(text='Concluir Lição')
+            btn_concluir.bind(on_press=lambda x: self.marcar_concluida(licao_id, btn_concluir))
+        botoes.add_widget(btn_concluir)
+        self.licoes_layout.add_widget(botoes)
+        self.scroll.scroll_y = 1
+
+    @perfilar
+    def marcar_concluida(self, licao_id, botao):
+        def gravar():
+            self.db.marcar_licao_concluida(licao_id)
+            return self.db.contar_licoes()
+
+        agendador_do_app().enviar(
+            gravar, prioridade=PRIORIDADE_ALTA, essencial=True,
+            ao_concluir=lambda contagem: self.exibir_progresso(*reversed(contagem))
+        )
         anim = Animation(background_color=Cores.VERDE, duration=0.3)
-        botao = cartao.children[0]
         anim.start(botao)
         botao.text = '✓ Concluída'
         botao.disabled = True
@@ -302,11 +1894,15 @@ class TelaPrincipia(Screen):
 # ==================== TELA MEU DINHEIRO ====================
 class TelaMeuDinheiro(Screen):
     """Aba de controle financeiro pessoal"""
+    # Chave comum das leituras que preenchem a lista: a última navegação substitui as pendentes
+    CHAVE_LISTA = 'lista_meu_dinheiro'
 
     def __init__(self, db, **kwargs):
         super().__init__(**kwargs)
         self.db = db
         self.name = 'meu_dinheiro'
+        self.exportando = False
+        self.botoes_exportacao = []
         layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
 
         # Cabeçalho
@@ -331,16 +1927,12 @@ class TelaMeuDinheiro(Screen):
             size_hint_y=None, height=dp(30)
         )
         saldo_cartao.add_widget(saldo_label)
-        saldo_atual = self.db.obter_saldo()
-        self.valor_saldo = Label(
-            text=f'R$ {saldo_atual:,.2f}', font_size=dp(32), bold=True,
-            color=Cores.VERDE if saldo_atual >= 0 else Cores.VERMELHO
-        )
+        self.valor_saldo = Label(text='R$ ...', font_size=dp(32), bold=True, color=Cores.AZUL_ESCURO)
         saldo_cartao.add_widget(self.valor_saldo)
         layout.add_widget(saldo_cartao)
 
         # Botões de ação
-        botoes = GridLayout(cols=2, spacing=dp(10), size_hint_y=None, height=dp(60))
+        botoes = GridLayout(cols=3, spacing=dp(10), size_hint_y=None, height=dp(60))
         btn_receita = BotaoDourado(text='+ Receita')
         btn_receita.background_color = Cores.VERDE
         btn_receita.bind(on_press=self.adicionar_receita)
@@ -350,18 +1942,37 @@ class TelaMeuDinheiro(Screen):
         btn_despesa.background_color = Cores.VERMELHO
         btn_despesa.bind(on_press=self.adicionar_despesa)
         botoes.add_widget(btn_despesa)
+
+        btn_orcamentos = BotaoDourado(text='🎯 Orçamentos')
+        btn_orcamentos.bind(on_press=lambda x: self.mostrar_orcamentos())
+        botoes.add_widget(btn_orcamentos)
         layout.add_widget(botoes)
 
         # Lista de transações
+        trans_header = BoxLayout(size_hint_y=None, height=dp(40))
         trans_label = Label(
-            text='Transações Recentes', font_size=dp(18), bold=True,
-            color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(40)
+            text='Transações Recentes', font_size=dp(18), bold=True, color=Cores.AZUL_ESCURO
         )
-        layout.add_widget(trans_label)
+        trans_header.add_widget(trans_label)
+        btn_extrato = Button(
+            text='📄 Extrato', size_hint_x=0.35, background_normal='',
+            background_color=Cores.AZUL_ESCURO, color=Cores.DOURADO
+        )
+        btn_extrato.bind(on_press=lambda x: self.mostrar_exportacao())
+        trans_header.add_widget(btn_extrato)
+        layout.add_widget(trans_header)
 
         scroll = ScrollView()
         self.lista_transacoes = BoxLayout(orientation='vertical', spacing=dp(5), size_hint_y=None, padding=dp(5))
         self.lista_transacoes.bind(minimum_height=self.lista_transacoes.setter('height'))
+        # Pinta do instantâneo na hora; o saldo só é recalculado se o app detectar que ele
+        # está velho, e a lista completa do mês chega em segundo plano
+        dados = painel_do_app()
+        if dados:
+            self.exibir_saldo(dados['saldo'])
+            self.exibir_transacoes(dados['transacoes'])
+        else:
+            self.atualizar_saldo()
         self.atualizar_transacoes()
         scroll.add_widget(self.lista_transacoes)
         layout.add_widget(scroll)
@@ -377,9 +1988,10 @@ class TelaMeuDinheiro(Screen):
     def adicionar_despesa(self, instance):
         self.mostrar_formulario('despesa')
 
+    @perfilar
     def mostrar_formulario(self, tipo):
-        self.lista_transacoes.clear_widgets()
-        form = BoxLayout(orientation='vertical', spacing=dp(10), size_hint_y=None, height=dp(300))
+        self.limpar_lista()
+        form = BoxLayout(orientation='vertical', spacing=dp(10), size_hint_y=None, height=dp(400))
         form.padding = dp(10)
 
         titulo = Label(
@@ -394,8 +2006,7 @@ class TelaMeuDinheiro(Screen):
         )
         form.add_widget(valor_input)
 
-        categorias = ['Salário', 'Freelance', 'Investimentos'] if tipo == 'receita' else \
-                     ['Alimentação', 'Transporte', 'Moradia', 'Lazer', 'Outros']
+        categorias = CATEGORIAS_RECEITA if tipo == 'receita' else CATEGORIAS_DESPESA
         categoria_spinner = Spinner(
             text='Selecione Categoria', values=categorias,
             size_hint_y=None, height=dp(45)
@@ -405,10 +2016,20 @@ class TelaMeuDinheiro(Screen):
         desc_input = TextInput(hint_text='Descrição', multiline=True, size_hint_y=None, height=dp(80))
         form.add_widget(desc_input)
 
+        repeticao = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(45))
+        repeticao_spinner = Spinner(text='Não repetir', values=list(FREQUENCIAS_RECORRENCIA))
+        repeticao.add_widget(repeticao_spinner)
+        intervalo_input = TextInput(
+            hint_text='N dias', input_filter='int', multiline=False, size_hint_x=0.4
+        )
+        repeticao.add_widget(intervalo_input)
+        form.add_widget(repeticao)
+
         botoes = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(50))
         btn_salvar = BotaoDourado(text='Salvar')
         btn_salvar.bind(on_press=lambda x: self.salvar_transacao(
-            tipo, categoria_spinner.text, valor_input.text, desc_input.text
+            tipo, categoria_spinner.text, valor_input.text, desc_input.text,
+            repeticao_spinner.text, intervalo_input.text
         ))
         botoes.add_widget(btn_salvar)
 
@@ -417,22 +2038,240 @@ class TelaMeuDinheiro(Screen):
         botoes.add_widget(btn_cancelar)
 
         form.add_widget(botoes)
+
+        # Motivo de um "Salvar" recusado pelas regras de validar_transacao/validar_recorrencia
+        self.aviso_formulario = Label(text='', color=Cores.VERMELHO, size_hint_y=None, height=dp(30))
+        self.aviso_formulario.bind(size=self.aviso_formulario.setter('text_size'))
+        form.add_widget(self.aviso_formulario)
         self.lista_transacoes.add_widget(form)
 
-    def salvar_transacao(self, tipo, categoria, valor, descricao):
+        agendador_do_app().enviar(
+            self.db.obter_recorrencias, tipo, prioridade=PRIORIDADE_ALTA, chave=self.CHAVE_LISTA,
+            ao_concluir=lambda regras: self.exibir_recorrencias(tipo, regras)
+        )
+
+    def exibir_recorrencias(self, tipo, regras):
+        for recorrencia_id, _, categoria, valor, descricao, frequencia, intervalo in regras:
+            periodo = f'a cada {intervalo} dias' if frequencia == 'dias' else frequencia
+            regra = BoxLayout(size_hint_y=None, height=dp(45), padding=dp(5))
+            rotulo = Label(
+                text=f'🔁 {categoria} - R$ {valor:,.2f} ({periodo})',
+                color=Cores.AZUL_ESCURO, halign='left'
+            )
+            rotulo.bind(size=rotulo.setter('text_size'))
+            regra.add_widget(rotulo)
+            btn_encerrar = Button(text='Encerrar', size_hint_x=0.3, background_color=Cores.VERMELHO)
+            btn_encerrar.bind(on_press=lambda x, r=recorrencia_id: self.encerrar_recorrencia(r, tipo))
+            regra.add_widget(btn_encerrar)
+            self.lista_transacoes.add_widget(regra)
+
+    def encerrar_recorrencia(self, recorrencia_id, tipo):
+        agendador_do_app().enviar(
+            self.db.desativar_recorrencia, recorrencia_id, prioridade=PRIORIDADE_ALTA, essencial=True,
+            ao_concluir=lambda _: self.mostrar_formulario(tipo)
+        )
+
+    @perfilar
+    def salvar_transacao(self, tipo, categoria, valor, descricao, repeticao='Não repetir', intervalo=''):
         try:
             valor_float = float(valor.replace(',', '.'))
-            self.db.adicionar_transacao(tipo, categoria, valor_float, descricao)
-            saldo_novo = self.db.obter_saldo()
-            self.valor_saldo.text = f'R$ {saldo_novo:,.2f}'
-            self.valor_saldo.color = Cores.VERDE if saldo_novo >= 0 else Cores.VERMELHO
-            self.atualizar_transacoes()
         except ValueError:
-            pass  # Tratar erro de valor inválido
+            self.aviso_formulario.text = '⚠ Informe o valor'
+            return
+        recorrencia = FREQUENCIAS_RECORRENCIA.get(repeticao)
+        try:
+            validar_transacao(tipo, categoria, valor_float)
+            if recorrencia:
+                frequencia, passo = recorrencia
+                passo = passo or int(intervalo or 0)
+                validar_recorrencia(frequencia, passo)
+        except ValueError as erro:
+            mensagem = str(erro)
+            self.aviso_formulario.text = f'⚠ {mensagem[:1].upper()}{mensagem[1:]}'
+            return
+        self.aviso_formulario.text = ''
+
+        def gravar():
+            if recorrencia:
+                # A primeira ocorrência (hoje) é lançada pela própria materialização
+                self.db.adicionar_recorrencia(tipo, categoria, valor_float, descricao, frequencia, passo)
+                self.db.materializar_recorrencias()
+                return None
+            return self.db.adicionar_transacao(tipo, categoria, valor_float, descricao)
+
+        agendador_do_app().enviar(
+            gravar, prioridade=PRIORIDADE_ALTA, essencial=True, ao_concluir=self.transacao_salva
+        )
+
+    def transacao_salva(self, alerta):
+        self.atualizar_saldo()
+        self.atualizar_transacoes(alerta)
+
+    def aplicar_painel(self, dados):
+        self.exibir_saldo(dados['saldo'])
+
+    def atualizar_saldo(self):
+        agendador_do_app().enviar(
+            self.db.obter_saldo, prioridade=PRIORIDADE_ALTA, chave='saldo', ao_concluir=self.exibir_saldo
+        )
+
+    def exibir_saldo(self, saldo_novo):
+        self.valor_saldo.text = f'R$ {saldo_novo:,.2f}'
+        self.valor_saldo.color = Cores.VERDE if saldo_novo >= 0 else Cores.VERMELHO
+
+    def limpar_lista(self):
+        """Prepara a lista para outro painel, descartando uma atualização ainda pendente"""
+        agendador_do_app().cancelar(self.CHAVE_LISTA)
+        limpar_widgets(self.lista_transacoes, 'TelaMeuDinheiro.limpar_lista')
+
+    def mostrar_alerta_orcamento(self, categoria, nivel, total, limite):
+        if nivel >= 1:
+            texto = f'🚨 {categoria} estourou o orçamento: R$ {total:,.2f} de R$ {limite:,.2f}'
+        else:
+            texto = f'⚠ {categoria} atingiu {nivel:.0%} do orçamento: R$ {total:,.2f} de R$ {limite:,.2f}'
+        aviso = Label(
+            text=texto, color=Cores.VERMELHO, bold=True, halign='center',
+            size_hint_y=None, height=dp(50)
+        )
+        aviso.bind(size=aviso.setter('text_size'))
+        # No BoxLayout vertical o maior índice fica no topo da lista
+        self.lista_transacoes.add_widget(aviso, index=len(self.lista_transacoes.children))
+
+    def mostrar_orcamentos(self):
+        agendador_do_app().enviar(
+            self.db.obter_orcamentos, prioridade=PRIORIDADE_ALTA, chave=self.CHAVE_LISTA,
+            ao_concluir=self.exibir_orcamentos
+        )
+
+    @perfilar
+    def exibir_orcamentos(self, orcamentos):
+        limpar_widgets(self.lista_transacoes, 'TelaMeuDinheiro.exibir_orcamentos')
+        self.lista_transacoes.add_widget(Label(
+            text='Orçamento Mensal por Categoria', font_size=dp(20), bold=True,
+            color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(40)
+        ))
+
+        definidos = {categoria: (limite, gasto) for categoria, limite, gasto in orcamentos}
+        entradas = {}
+        for categoria in CATEGORIAS_DESPESA:
+            limite, gasto = definidos.get(categoria, (0, 0))
+            linha = BoxLayout(orientation='vertical', size_hint_y=None, height=dp(95), padding=dp(5))
+            resumo = f'{categoria}: R$ {gasto:,.2f} de R$ {limite:,.2f}' if limite else f'{categoria}: sem limite'
+            rotulo = Label(
+                text=resumo, color=Cores.AZUL_ESCURO, bold=True, halign='left',
+                size_hint_y=None, height=dp(30)
+            )
+            rotulo.bind(size=rotulo.setter('text_size'))
+            linha.add_widget(rotulo)
+            linha.add_widget(ProgressBar(
+                max=limite or 1, value=min(gasto, limite) if limite else 0, size_hint_y=None, height=dp(10)
+            ))
+            entradas[categoria] = TextInput(
+                hint_text='Limite mensal (R$)', text=f'{limite:.2f}' if limite else '',
+                input_filter='float', multiline=False, size_hint_y=None, height=dp(45)
+            )
+            linha.add_widget(entradas[categoria])
+            self.lista_transacoes.add_widget(linha)
+
+        botoes = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(50))
+        btn_salvar = BotaoDourado(text='Salvar')
+        btn_salvar.bind(on_press=lambda x: self.salvar_orcamentos(entradas))
+        botoes.add_widget(btn_salvar)
+
+        btn_voltar = Button(text='Voltar', background_color=[0.5, 0.5, 0.5, 1])
+        btn_voltar.bind(on_press=lambda x: self.atualizar_transacoes())
+        botoes.add_widget(btn_voltar)
+        self.lista_transacoes.add_widget(botoes)
+
+    @perfilar
+    def mostrar_exportacao(self):
+        self.limpar_lista()
+        self.lista_transacoes.add_widget(Label(
+            text='Exportar Extrato em PDF', font_size=dp(20), bold=True,
+            color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(40)
+        ))
+        hoje = date.today()
+        ultimo_dia = calendar.monthrange(hoje.year, hoje.month)[1]
+        periodos = [
+            ('Mês Atual', hoje.replace(day=1), hoje.replace(day=ultimo_dia)),
+            ('Ano Atual', date(hoje.year, 1, 1), date(hoje.year, 12, 31)),
+        ]
+        botoes = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(50))
+        self.botoes_exportacao = []
+        for texto, inicio, fim in periodos:
+            # Desabilitados enquanto um extrato está sendo gerado, mesmo ao voltar ao painel
+            botao = BotaoDourado(text=texto, disabled=self.exportando)
+            botao.bind(on_press=lambda x, i=inicio, f=fim: self.exportar_extrato(i, f))
+            botoes.add_widget(botao)
+            self.botoes_exportacao.append(botao)
+        self.lista_transacoes.add_widget(botoes)
+
+        self.barra_exportacao = ProgressBar(max=1, value=0, size_hint_y=None, height=dp(10))
+        self.lista_transacoes.add_widget(self.barra_exportacao)
+        self.status_exportacao = Label(
+            text='', color=Cores.AZUL_ESCURO, halign='center', size_hint_y=None, height=dp(60)
+        )
+        self.status_exportacao.bind(size=self.status_exportacao.setter('text_size'))
+        self.lista_transacoes.add_widget(self.status_exportacao)
+
+        btn_voltar = Button(text='Voltar', background_color=[0.5, 0.5, 0.5, 1], size_hint_y=None, height=dp(50))
+        btn_voltar.bind(on_press=lambda x: self.atualizar_transacoes())
+        self.lista_transacoes.add_widget(btn_voltar)
+
+    def exportar_extrato(self, inicio, fim):
+        inicio, fim = inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d')
+        caminho = os.path.join(pasta_relatorios(), f'extrato_{inicio}_{fim}.pdf')
+        self.status_exportacao.text = 'Gerando PDF...'
+        self.definir_exportando(True)
+        exportar_em_segundo_plano(
+            caminho, 'Extrato', blocos_extrato(self.db, inicio, fim),
+            self.progresso_exportacao, self.exportacao_concluida
+        )
+
+    def progresso_exportacao(self, paginas, fracao):
+        self.barra_exportacao.value = fracao
+        self.status_exportacao.text = f'Gerando PDF... {fracao:.0%} ({paginas} páginas)'
+
+    def definir_exportando(self, exportando):
+        self.exportando = exportando
+        for botao in self.botoes_exportacao:
+            botao.disabled = exportando
+
+    def exportacao_concluida(self, caminho, resultado):
+        self.definir_exportando(False)
+        if caminho is None:
+            self.status_exportacao.text = f'⚠ Falha ao gerar o PDF: {resultado}'
+        else:
+            self.status_exportacao.text = f'✓ {resultado} páginas salvas em\n{caminho}'
 
-    def atualizar_transacoes(self):
-        self.lista_transacoes.clear_widgets()
-        transacoes = self.db.obter_transacoes_mes_atual()
+    def salvar_orcamentos(self, entradas):
+        try:
+            limites = {}
+            for categoria, entrada in entradas.items():
+                texto = entrada.text.strip().replace(',', '.')
+                limites[categoria] = float(texto) if texto else None
+        except ValueError:
+            return  # Tratar erro de valor inválido
+
+        def gravar():
+            for categoria, limite in limites.items():
+                self.db.definir_orcamento(categoria, limite)
+
+        agendador_do_app().enviar(
+            gravar, prioridade=PRIORIDADE_ALTA, essencial=True, ao_concluir=lambda _: self.atualizar_transacoes()
+        )
+
+    def atualizar_transacoes(self, alerta=None):
+        agendador_do_app().enviar(
+            self.db.obter_transacoes_mes_atual, chave=self.CHAVE_LISTA,
+            ao_concluir=lambda transacoes: self.exibir_transacoes(transacoes, alerta)
+        )
+
+    @perfilar
+    def exibir_transacoes(self, transacoes, alerta=None):
+        limpar_widgets(self.lista_transacoes, 'TelaMeuDinheiro.exibir_transacoes')
+        if alerta:
+            self.mostrar_alerta_orcamento(*alerta)
         if not transacoes:
             msg = Label(
                 text='Nenhuma transação este mês.\nComece adicionando uma receita ou despesa!',
@@ -495,6 +2334,17 @@ class TelaInvestimentos(Screen):
         header.add_widget(titulo)
         layout.add_widget(header)
 
+        self.carteira_label = Label(
+            text='💼 Carteira: R$ ...', font_size=dp(16), bold=True,
+            color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(30)
+        )
+        layout.add_widget(self.carteira_label)
+        dados = painel_do_app()
+        if dados:
+            self.exibir_carteira(dados['carteira_total'])
+        else:
+            agendador_do_app().enviar(self.db.obter_total_carteira, ao_concluir=self.exibir_carteira)
+
         scroll = ScrollView()
         form_layout = BoxLayout(orientation='vertical', spacing=dp(15), size_hint_y=None, padding=dp(10))
         form_layout.bind(minimum_height=form_layout.setter('height'))
@@ -534,22 +2384,31 @@ class TelaInvestimentos(Screen):
         self.header_rect.pos = instance.pos
         self.header_rect.size = instance.size
 
+    def exibir_carteira(self, total):
+        self.carteira_label.text = f'💼 Carteira: R$ {total:,.2f}'
+
+    def aplicar_painel(self, dados):
+        self.exibir_carteira(dados['carteira_total'])
+
+    @perfilar
     def simular(self, instance):
         try:
             valor = float(self.valor_input.text.replace(',', '.'))
             taxa = float(self.taxa_input.text.replace(',', '.')) / 100
 
-            prazo_texto = self.prazo_spinner.text
-            if 'Curto' in prazo_texto:
-                meses = 10
-            elif 'Médio' in prazo_texto:
-                meses = 20
-            else:
-                meses = 40
-
-            montante = valor * ((1 + taxa) ** (meses / 12))
-            rendimento = montante - valor
+            meses = meses_do_prazo(self.prazo_spinner.text)
+        except ValueError:
+            self.resultado_label.text = '⚠ Preencha todos os campos corretamente'
+            return
+        # Um novo toque em "Simular" substitui a simulação anterior ainda não entregue
+        agendador_do_app().enviar(
+            simular_investimento, valor, taxa, meses,
+            prioridade=PRIORIDADE_ALTA, chave='simulacao', processo=True,
+            ao_concluir=lambda resultado: self.exibir_simulacao(valor, taxa, meses, *resultado)
+        )
 
+    def exibir_simulacao(self, valor, taxa, meses, montante, rendimento):
+        try:
             self.resultado_label.text = f'''
 ✨ PROJEÇÃO DE INVESTIMENTO ✨
 💰 Valor Investido: R$ {valor:,.2f}
@@ -559,7 +2418,7 @@ class TelaInvestimentos(Screen):
 💎 Rendimento: R$ {rendimento:,.2f}
 📊 Rentabilidade: {(rendimento / valor * 100):.1f}%
 '''
-        except ValueError:
+        except ZeroDivisionError:
             self.resultado_label.text = '⚠ Preencha todos os campos corretamente'
 
 
@@ -650,6 +2509,9 @@ class TelaPlanoMestre(Screen):
         self.name = 'plano_mestre'
         self.pergunta_atual = 0
         self.respostas = {}
+        self.cache_cenarios = {}
+        # Tela e agendador podem pedir os mesmos cenários juntos; só um grava o plano
+        self.trava_cenarios = threading.Lock()
         self.perguntas = [
             {'titulo': '🎯 Qual é sua ideia de negócio?',
              'dica': 'Descreva brevemente o que você quer criar ou vender'},
@@ -697,8 +2559,9 @@ class TelaPlanoMestre(Screen):
         self.header_rect.pos = instance.pos
         self.header_rect.size = instance.size
 
+    @perfilar
     def mostrar_pergunta(self):
-        self.container_pergunta.clear_widgets()
+        limpar_widgets(self.container_pergunta, 'TelaPlanoMestre.mostrar_pergunta')
         if self.pergunta_atual >= len(self.perguntas):
             self.mostrar_resultado()
             return
@@ -765,8 +2628,9 @@ class TelaPlanoMestre(Screen):
             self.progresso_label.text = f'Pergunta {self.pergunta_atual + 1} de {len(self.perguntas)}'
             self.mostrar_pergunta()
 
+    @perfilar
     def mostrar_resultado(self):
-        self.container_pergunta.clear_widgets()
+        limpar_widgets(self.container_pergunta, 'TelaPlanoMestre.mostrar_resultado')
         scroll = ScrollView()
         resultado = BoxLayout(orientation='vertical', spacing=dp(15), size_hint_y=None, padding=dp(15))
         resultado.bind(minimum_height=resultado.setter('height'))
@@ -808,6 +2672,25 @@ class TelaPlanoMestre(Screen):
         resumo_card.add_widget(resumo_label)
         resultado.add_widget(resumo_card)
 
+        equilibrio_card = CartaoElegante()
+        equilibrio_card.height = dp(260)
+        equilibrio_card.add_widget(Label(
+            text='📐 PONTO DE EQUILÍBRIO', font_size=dp(18), bold=True,
+            color=Cores.AZUL_ESCURO, size_hint_y=None, height=dp(35)
+        ))
+        equilibrio_label = Label(
+            text='Calculando cenários...', font_size=dp(13),
+            color=Cores.AZUL_ESCURO, halign='left', valign='top'
+        )
+        equilibrio_label.bind(size=equilibrio_label.setter('text_size'))
+        agendador_do_app().enviar(
+            # Essencial: a primeira chamada também grava o plano respondido
+            self.obter_cenarios, chave='cenarios', essencial=True,
+            ao_concluir=lambda cenarios: setattr(equilibrio_label, 'text', self.formatar_cenarios(cenarios))
+        )
+        equilibrio_card.add_widget(equilibrio_label)
+        resultado.add_widget(equilibrio_card)
+
         recomendacoes_card = CartaoElegante()
         recomendacoes_card.height = dp(280)
         recomendacoes_card.add_widget(Label(
@@ -841,12 +2724,92 @@ class TelaPlanoMestre(Screen):
 
         btn_exportar = BotaoDourado(text='📄 Exportar PDF')
         btn_exportar.background_color = Cores.VERDE
+        btn_exportar.bind(on_press=self.exportar_pdf)
         botoes.add_widget(btn_exportar)
 
         resultado.add_widget(botoes)
+        self.status_exportacao = Label(
+            text='', font_size=dp(12), color=Cores.AZUL_ESCURO, halign='center',
+            size_hint_y=None, height=dp(40)
+        )
+        self.status_exportacao.bind(size=self.status_exportacao.setter('text_size'))
+        resultado.add_widget(self.status_exportacao)
         scroll.add_widget(resultado)
         self.container_pergunta.add_widget(scroll)
 
+    def obter_cenarios(self, respostas=None):
+        """Calcula os cenários do plano, reaproveitando a memória e o banco"""
+        respostas = self.respostas if respostas is None else respostas
+        investimento = interpretar_valor(respostas.get(2, ''))
+        faturamento = interpretar_valor(respostas.get(3, ''))
+        if investimento is None or not faturamento:
+            return None
+
+        nome = respostas.get(0, 'Sem nome')[:80]
+        chave = hashlib.sha1(
+            json.dumps([VERSAO_MODELO_CENARIOS, nome, investimento, faturamento]).encode('utf-8')
+        ).hexdigest()
+        with self.trava_cenarios:
+            if chave in self.cache_cenarios:
+                return self.cache_cenarios[chave]
+
+            cenarios = self.db.obter_cenario(chave)
+            if cenarios is None:
+                cenarios = projetar_cenarios(investimento, faturamento)
+                negocio_id = self.db.salvar_negocio(
+                    nome, respostas.get(1, ''), investimento, faturamento
+                )
+                self.db.salvar_cenario(chave, negocio_id, cenarios)
+            self.cache_cenarios[chave] = cenarios
+            return cenarios
+
+    def formatar_cenarios(self, cenarios):
+        if cenarios is None:
+            return ('Informe valores numéricos de investimento e faturamento '
+                    '(ex: "R$ 15.000" ou "8 mil") para calcular o ponto de equilíbrio.')
+
+        def mes_texto(mes):
+            return f'mês {mes}' if mes is not None else 'não se paga'
+
+        base = cenarios['base']
+        fluxo = base['fluxo_acumulado']
+        pior, melhor = cenarios['pior'], cenarios['melhor']
+        payback = f"{base['payback_meses']:.1f} meses" if base['payback_meses'] is not None else '-'
+        return f'''💰 Lucro mensal estimado: R$ {base['lucro_mensal']:,.2f} (margem {base['margem']:.0%})
+⏱ Equilíbrio: {mes_texto(base['mes_equilibrio'])} (payback {payback})
+📈 Fluxo acumulado: 6m R$ {fluxo[6]:,.2f} | 12m R$ {fluxo[12]:,.2f} | {HORIZONTE_MESES}m R$ {fluxo[HORIZONTE_MESES]:,.2f}
+
+🔬 SENSIBILIDADE (preço × volume × custo):
+{cenarios['viaveis_no_horizonte']} de {cenarios['cenarios']} cenários se pagam em até {HORIZONTE_MESES} meses
+Pior caso: {mes_texto(pior['mes_equilibrio'])} (preço {pior['preco']:.0%}, volume {pior['volume']:.0%}, custo {pior['custo']:.0%})
+Melhor caso: {mes_texto(melhor['mes_equilibrio'])} (preço {melhor['preco']:.0%}, volume {melhor['volume']:.0%}, custo {melhor['custo']:.0%})
+'''
+
+    def exportar_pdf(self, instance):
+        instance.disabled = True
+        caminho = os.path.join(pasta_relatorios(), f'plano_{datetime.now():%Y%m%d_%H%M%S}.pdf')
+        respostas = dict(self.respostas)
+
+        def blocos():
+            # Roda no agendador: espera o cálculo da tela, se ainda estiver em andamento
+            cenarios = self.formatar_cenarios(self.obter_cenarios(respostas))
+            yield from blocos_plano(respostas, self.perguntas, cenarios)
+
+        self.status_exportacao.text = 'Gerando PDF...'
+
+        def concluir(caminho_pdf, resultado):
+            instance.disabled = False
+            if caminho_pdf is None:
+                self.status_exportacao.text = f'⚠ Falha ao gerar o PDF: {resultado}'
+            else:
+                self.status_exportacao.text = f'✓ Plano salvo em {caminho_pdf}'
+
+        exportar_em_segundo_plano(
+            caminho, 'Plano de Negócios', blocos(),
+            lambda paginas, fracao: setattr(self.status_exportacao, 'text', f'Gerando PDF... {paginas} páginas'),
+            concluir
+        )
+
     def reiniciar(self, instance):
         self.pergunta_atual = 0
         self.respostas = {}
@@ -891,37 +2854,402 @@ class BarraNavegacao(BoxLayout):
         self.rect.pos = self.pos
         self.rect.size = self.size
 
+    @perfilar
     def mudar_tela(self, nome_tela):
         self.screen_manager.current = nome_tela
 
 
+# ==================== SERVIDOR API LOCAL ====================
+class PoolLeitura:
+    """Conexões somente leitura reaproveitadas entre requisições.
+
+    Com banco em memória não há como abrir outras conexões, então todas as
+    leituras usam o próprio escritor (serializadas pela trava dele).
+    """
+
+    def __init__(self, escritor, tamanho):
+        self.fila = queue.Queue()
+        self.compartilhado = escritor.caminho == ':memory:'
+        if self.compartilhado:
+            self.fila.put(escritor)
+        else:
+            for _ in range(tamanho):
+                self.fila.put(DatabaseManager(escritor.caminho, somente_leitura=True))
+
+    @contextlib.contextmanager
+    def emprestar(self):
+        if self.compartilhado:
+            yield self.fila.queue[0]
+            return
+        db = self.fila.get()
+        try:
+            yield db
+        finally:
+            self.fila.put(db)
+
+    def fechar(self):
+        while not self.fila.empty():
+            self.fila.get().conn.close()
+
+
+class ServidorAPI(http.server.HTTPServer):
+    """Servidor HTTP cujas requisições são atendidas por um pool fixo de threads"""
+    INTERVALO_RECORRENCIAS_S = 3600
+
+    def __init__(self, endereco, caminho_banco, trabalhadores=8, leitores=4):
+        self.escritor = DatabaseManager(caminho_banco)
+        if caminho_banco != ':memory:':
+            # WAL deixa os leitores consultarem enquanto o escritor grava
+            self.escritor.conn.execute('PRAGMA journal_mode=WAL')
+        # Mesma regra do app: ocorrências vencidas são lançadas na abertura e de hora em hora
+        self.escritor.materializar_recorrencias()
+        self.encerrando = threading.Event()
+        threading.Thread(target=self._materializar_periodicamente, name='api-recorrencias', daemon=True).start()
+        self.leitores = PoolLeitura(self.escritor, leitores)
+        self.pool = ThreadPoolExecutor(trabalhadores, thread_name_prefix='api')
+        super().__init__(endereco, ManipuladorAPI)
+
+    def _materializar_periodicamente(self):
+        while not self.encerrando.wait(self.INTERVALO_RECORRENCIAS_S):
+            try:
+                inseridas = self.escritor.materializar_recorrencias()
+            except sqlite3.Error as erro:
+                Logger.error(f'API: falha ao lançar recorrências: {erro!r}')
+                continue
+            if inseridas:
+                Logger.info(f'API: {inseridas} ocorrências recorrentes lançadas')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        self.encerrando.set()
+        super().server_close()
+        self.pool.shutdown(wait=True)
+        self.leitores.fechar()
+        self.escritor.conn.close()
+
+
+class ErroAPI(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class ManipuladorAPI(http.server.BaseHTTPRequestHandler):
+    """Rotas JSON do modo servidor; leituras usam o pool e escritas o escritor único"""
+    protocol_version = 'HTTP/1.1'
+    # Uma conexão keep-alive ocupa uma thread do pool; ociosa além disso, é fechada
+    timeout = 15
+    # Teto dos campos numéricos: acima disso os cálculos estouram o float
+    LIMITE_NUMERICO = 1e12
+
+    def do_GET(self):
+        self._despachar({
+            '/api/saldo': self.get_saldo,
+            '/api/painel': self.get_painel,
+            '/api/transacoes': self.get_transacoes,
+            '/api/orcamentos': self.get_orcamentos,
+            '/api/relatorios/mensal': self.get_relatorio_mensal,
+        })
+
+    def do_POST(self):
+        self._despachar({
+            '/api/transacoes': self.post_transacao,
+            '/api/simulacoes/investimento': self.post_simulacao_investimento,
+            '/api/simulacoes/negocio': self.post_simulacao_negocio,
+        })
+
+    def log_message(self, formato, *args):
+        Logger.info('API: %s - %s' % (self.address_string(), formato % args))
+
+    def _despachar(self, rotas):
+        url = urllib.parse.urlsplit(self.path)
+        self.parametros = {chave: valores[-1] for chave, valores in urllib.parse.parse_qs(url.query).items()}
+        try:
+            # Lido antes de rotear: um corpo ignorado viraria a próxima requisição do keep-alive
+            self.corpo = self._ler_corpo()
+            rota = rotas.get(url.path.rstrip('/'))
+            if rota is None:
+                raise ErroAPI(404, f'rota não encontrada: {url.path}')
+            status, corpo = rota()
+        except ErroAPI as erro:
+            status, corpo = erro.status, {'erro': str(erro)}
+        except Exception as erro:
+            self.log_error('erro interno: %r', erro)
+            status, corpo = 500, {'erro': 'erro interno'}
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_corpo(self):
+        if self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+            raise ErroAPI(411, 'envie o corpo com Content-Length')
+        cabecalho = self.headers.get('Content-Length') or '0'
+        try:
+            tamanho = int(cabecalho)
+            if tamanho < 0:
+                raise ValueError(cabecalho)
+        except ValueError:
+            # Sem saber onde o corpo termina, a conexão não pode ser reaproveitada
+            self.close_connection = True
+            raise ErroAPI(400, f'Content-Length inválido: {cabecalho!r}')
+        return self.rfile.read(tamanho)
+
+    def _corpo_json(self):
+        try:
+            corpo = json.loads(self.corpo or b'{}')
+        except ValueError:
+            raise ErroAPI(400, 'JSON inválido')
+        if not isinstance(corpo, dict):
+            raise ErroAPI(400, 'o corpo deve ser um objeto JSON')
+        return corpo
+
+    def _numero(self, corpo, campo):
+        # bool é subclasse de int: sem isto, true viraria 1.0
+        if isinstance(corpo.get(campo), bool):
+            raise ErroAPI(400, f'campo numérico obrigatório: {campo}')
+        try:
+            valor = float(corpo[campo])
+        except (KeyError, TypeError, ValueError):
+            raise ErroAPI(400, f'campo numérico obrigatório: {campo}')
+        if not math.isfinite(valor) or abs(valor) > self.LIMITE_NUMERICO:
+            raise ErroAPI(400, f'valor inválido em {campo}')
+        return valor
+
+    def _mes(self):
+        mes = self.parametros.get('mes') or datetime.now().strftime('%Y-%m')
+        if not re.fullmatch(r'\d{4}-\d{2}', mes):
+            raise ErroAPI(400, 'mes deve estar no formato AAAA-MM')
+        return mes
+
+    def get_saldo(self):
+        with self.server.leitores.emprestar() as db:
+            return 200, {'saldo': db.obter_saldo()}
+
+    def get_painel(self):
+        with self.server.leitores.emprestar() as db:
+            return 200, db.obter_painel()
+
+    def get_transacoes(self):
+        mes = self._mes()
+        inicio = self.parametros.get('inicio') or f'{mes}-01'
+        fim = self.parametros.get('fim') or f'{mes}-31'
+        try:
+            limite = max(1, min(int(self.parametros.get('limite', 500)), 5000))
+        except ValueError:
+            raise ErroAPI(400, 'limite deve ser inteiro')
+        transacoes = []
+        with self.server.leitores.emprestar() as db:
+            for lote in db.iterar_transacoes(inicio, fim, lote=min(limite, 500)):
+                transacoes.extend(lote)
+                if len(transacoes) >= limite:
+                    break
+        campos = ('tipo', 'categoria', 'valor', 'descricao', 'data')
+        return 200, {'transacoes': [dict(zip(campos, linha)) for linha in transacoes[:limite]]}
+
+    def get_orcamentos(self):
+        with self.server.leitores.emprestar() as db:
+            orcamentos = db.obter_orcamentos(self._mes())
+        return 200, {'orcamentos': [
+            {'categoria': categoria, 'limite': limite, 'gasto': gasto}
+            for categoria, limite, gasto in orcamentos
+        ]}
+
+    def get_relatorio_mensal(self):
+        mes = self._mes()
+        with self.server.leitores.emprestar() as db:
+            linhas = db.resumo_mensal(mes)
+        categorias = [
+            {'tipo': tipo, 'categoria': categoria, 'total': total, 'quantidade': quantidade}
+            for tipo, categoria, total, quantidade in linhas
+        ]
+        receitas = sum(c['total'] for c in categorias if c['tipo'] == 'receita')
+        despesas = sum(c['total'] for c in categorias if c['tipo'] == 'despesa')
+        return 200, {'mes': mes, 'receitas': receitas, 'despesas': despesas,
+                     'saldo': receitas - despesas, 'categorias': categorias}
+
+    def post_transacao(self):
+        corpo = self._corpo_json()
+        tipo, categoria = corpo.get('tipo'), corpo.get('categoria')
+        valor = self._numero(corpo, 'valor')
+        descricao = str(corpo.get('descricao', ''))
+        try:
+            validar_transacao(tipo, categoria, valor)
+        except ValueError as erro:
+            raise ErroAPI(400, str(erro))
+        alerta = self.server.escritor.adicionar_transacao(tipo, categoria, valor, descricao)
+        resposta = {'tipo': tipo, 'categoria': categoria, 'valor': valor, 'descricao': descricao}
+        if alerta:
+            resposta['alerta'] = dict(zip(('categoria', 'nivel', 'total', 'limite'), alerta))
+        return 201, resposta
+
+    def post_simulacao_investimento(self):
+        corpo = self._corpo_json()
+        valor = self._numero(corpo, 'valor')
+        taxa = self._numero(corpo, 'taxa_anual') / 100
+        meses = self._numero(corpo, 'meses')
+        if valor <= 0 or meses <= 0:
+            raise ErroAPI(400, 'valor e meses devem ser positivos')
+        if taxa <= -1:
+            raise ErroAPI(400, 'taxa_anual deve ser maior que -100')
+        try:
+            montante, rendimento = simular_investimento(valor, taxa, meses)
+        except OverflowError:
+            montante = rendimento = math.inf
+        if not math.isfinite(montante):
+            raise ErroAPI(400, 'valores grandes demais para simular')
+        return 200, {'valor': valor, 'taxa_anual': taxa * 100, 'meses': meses,
+                     'montante': montante, 'rendimento': rendimento}
+
+    def post_simulacao_negocio(self):
+        corpo = self._corpo_json()
+        investimento = self._numero(corpo, 'investimento')
+        faturamento = self._numero(corpo, 'faturamento')
+        if investimento < 0 or faturamento <= 0:
+            raise ErroAPI(400, 'investimento não pode ser negativo e faturamento deve ser positivo')
+        return 200, projetar_cenarios(investimento, faturamento)
+
+
+def executar_servidor(argv):
+    """Modo servidor: `python main.py --servidor [--host H] [--porta P] [--banco caminho]`"""
+    parser = argparse.ArgumentParser(prog='main.py --servidor', description='API JSON do Riqueza Babilônica')
+    parser.add_argument('--servidor', action='store_true')
+    parser.add_argument('--host', default='127.0.0.1', help='use 0.0.0.0 para aceitar outros aparelhos da rede')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--banco', default=CAMINHO_BANCO)
+    parser.add_argument('--trabalhadores', type=int, default=8)
+    parser.add_argument('--leitores', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    servidor = ServidorAPI((args.host, args.porta), args.banco, args.trabalhadores, args.leitores)
+    Logger.info(f'API: servindo {args.banco} em http://{args.host}:{servidor.server_address[1]}')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
 # ==================== APLICATIVO PRINCIPAL ====================
 class RiquezaBabilonicaApp(App):
     """Classe principal do aplicativo"""
 
     def build(self):
+        rastro_inicio.marcar('app_preparo')
         self.title = '🏛 Riqueza Babilônica'
+        self.agendador = AgendadorTarefas()
+        self.painel = InstantaneoPainel(os.path.join(self.user_data_dir, 'painel.json'))
+        rastro_inicio.marcar('instantaneo')
         self.db = DatabaseManager()
+        self.db.materializar_recorrencias()
+        rastro_inicio.marcar('recorrencias')
+        Clock.schedule_interval(lambda dt: self.materializar_recorrencias(), 3600)
 
         layout_principal = BoxLayout(orientation='vertical')
         self.sm = ScreenManager()
 
-        self.sm.add_widget(TelaPrincipia(self.db))
-        self.sm.add_widget(TelaMeuDinheiro(self.db))
-        self.sm.add_widget(TelaMeuNegocio(self.db))
-        self.sm.add_widget(TelaInvestimentos(self.db))
-        self.sm.add_widget(TelaPlanoMestre(self.db))
+        for classe_tela in (TelaPrincipia, TelaMeuDinheiro, TelaMeuNegocio, TelaInvestimentos, TelaPlanoMestre):
+            tela = classe_tela(self.db)
+            self.sm.add_widget(tela)
+            rastro_inicio.marcar(f'tela_{tela.name}')
 
         layout_principal.add_widget(self.sm)
         self.nav_bar = BarraNavegacao(self.sm)
         layout_principal.add_widget(self.nav_bar)
+        rastro_inicio.marcar('navegacao')
+
+        self.reconciliar_painel()
+
+        if rastro_inicio.ativo:
+            from kivy.core.window import Window
+            Window.bind(on_flip=self.primeiro_quadro)
+
+        if PERFIL_ATIVO:
+            perfilador.observar_telas(self.sm)
+            perfilador.iniciar(os.path.join(self.user_data_dir, 'perfil_quadros.log'))
+
+        if MEMORIA_ATIVA:
+            memoria.observar_telas(self.sm)
+            memoria.iniciar(os.path.join(self.user_data_dir, 'perfil_memoria.log'))
+
+        if platform == 'android':
+            # Até o Android 9 gravar em Download/ (relatórios PDF) exige a permissão em tempo de execução
+            from android.permissions import Permission, request_permissions
+            request_permissions([Permission.WRITE_EXTERNAL_STORAGE])
 
         return layout_principal
 
+    def materializar_recorrencias(self):
+        """Lança as ocorrências que venceram com o app aberto (ex.: virada do mês)"""
+        self.agendador.enviar(
+            self.db.materializar_recorrencias, prioridade=PRIORIDADE_BAIXA, chave='recorrencias',
+            ao_concluir=self.recorrencias_materializadas
+        )
+
+    def recorrencias_materializadas(self, inseridas):
+        if inseridas:
+            tela = self.sm.get_screen('meu_dinheiro')
+            tela.atualizar_saldo()
+            tela.atualizar_transacoes()
+
+    def reconciliar_painel(self):
+        """Confere a versão do instantâneo em segundo plano e o refaz se estiver velho"""
+        def verificar():
+            if self.painel.atual(self.db.obter_id_banco(), self.db.obter_versao()):
+                return None
+            return self.db.obter_painel()
+
+        self.agendador.enviar(verificar, chave='painel', ao_concluir=self.painel_reconciliado)
+
+    def painel_reconciliado(self, dados):
+        if dados is None:
+            return
+        for nome in ('principia', 'meu_dinheiro', 'investimentos'):
+            self.sm.get_screen(nome).aplicar_painel(dados)
+        self.agendador.enviar(self.painel.salvar, dados, prioridade=PRIORIDADE_BAIXA, chave='salvar_painel')
+
+    def salvar_painel(self):
+        if not self.painel.atual(self.db.obter_id_banco(), self.db.obter_versao()):
+            self.painel.salvar(self.db.obter_painel())
+
+    def on_pause(self):
+        self.salvar_painel()
+        return True
+
+    def primeiro_quadro(self, window):
+        window.unbind(on_flip=self.primeiro_quadro)
+        rastro_inicio.marcar('primeiro_quadro')
+        rastro_inicio.persistir(os.path.join(self.user_data_dir, 'rastros_inicio.json'))
+
     def on_stop(self):
-        self.db.conn.close()
+        perfilador.parar()
+        memoria.parar()
+        # Espera as gravações pendentes; só então a conexão pode ser fechada
+        self.agendador.encerrar()
+        self.salvar_painel()
+        with self.db.trava:
+            self.db.conn.close()
 
 
 # ==================== EXECUÇÃO ====================
 if __name__ == '__main__':
-    RiquezaBabilonicaApp().run()
\ No newline at end of file
+    if '--servidor' in sys.argv:
+        executar_servidor(sys.argv[1:])
+    else:
+        RiquezaBabilonicaApp().run()
\ No newline at end of file
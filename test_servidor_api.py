@@ -0,0 +1,154 @@
+"""
+RIQUEZA BABILÔNICA - Testes da API local
+Sobe o ServidorAPI numa porta livre de 127.0.0.1 e exercita as rotas por HTTP.
+
+Uso:
+    python -m pytest test_servidor_api.py
+    python -m unittest test_servidor_api
+"""
+
+import os
+
+# O Kivy interpreta sys.argv ao ser importado; as opções aqui são do executor de testes
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+import http.client
+import json
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from main import ManipuladorAPI, ServidorAPI
+
+
+class ServidorLocal:
+    """ServidorAPI atendendo em segundo plano numa porta escolhida pelo sistema"""
+
+    def __init__(self, caminho_banco=':memory:'):
+        self.servidor = ServidorAPI(('127.0.0.1', 0), caminho_banco, trabalhadores=2, leitores=2)
+        self.porta = self.servidor.server_address[1]
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.thread.start()
+
+    def conexao(self):
+        return http.client.HTTPConnection('127.0.0.1', self.porta, timeout=5)
+
+    def bruto(self, dados):
+        """Envia bytes crus e lê a resposta até o servidor fechar a conexão"""
+        with socket.create_connection(('127.0.0.1', self.porta), timeout=5) as conexao:
+            conexao.sendall(dados)
+            resposta = b''
+            while parte := conexao.recv(65536):
+                resposta += parte
+        return resposta.decode('utf-8')
+
+    def fechar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.thread.join()
+
+
+def requisitar(conexao, metodo, rota, corpo=None):
+    dados = None if corpo is None else json.dumps(corpo).encode('utf-8')
+    cabecalhos = {} if dados is None else {'Content-Type': 'application/json'}
+    conexao.request(metodo, rota, body=dados, headers=cabecalhos)
+    resposta = conexao.getresponse()
+    return resposta.status, json.loads(resposta.read())
+
+
+class TestRotas(unittest.TestCase):
+    def setUp(self):
+        self.local = ServidorLocal()
+        self.conexao = self.local.conexao()
+
+    def tearDown(self):
+        self.conexao.close()
+        self.local.fechar()
+
+    def test_transacao_altera_saldo_e_painel(self):
+        status, _ = requisitar(self.conexao, 'POST', '/api/transacoes',
+                               {'tipo': 'receita', 'categoria': 'Salário', 'valor': 1500})
+        self.assertEqual(status, 201)
+        requisitar(self.conexao, 'POST', '/api/transacoes',
+                   {'tipo': 'despesa', 'categoria': 'Moradia', 'valor': 400, 'descricao': 'Aluguel'})
+        self.assertEqual(requisitar(self.conexao, 'GET', '/api/saldo'), (200, {'saldo': 1100}))
+        status, painel = requisitar(self.conexao, 'GET', '/api/painel')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(painel['transacoes']), 2)
+
+    def test_transacao_invalida(self):
+        for corpo in ({'tipo': 'despesa', 'categoria': 'Moradia', 'valor': True},
+                      {'tipo': 'despesa', 'categoria': 'Moradia', 'valor': 0},
+                      {'tipo': 'despesa', 'categoria': 'Inexistente', 'valor': 10},
+                      {'tipo': 'despesa', 'categoria': 'Moradia'}):
+            with self.subTest(corpo=corpo):
+                status, resposta = requisitar(self.conexao, 'POST', '/api/transacoes', corpo)
+                self.assertEqual(status, 400)
+                self.assertIn('erro', resposta)
+        self.assertEqual(requisitar(self.conexao, 'GET', '/api/saldo'), (200, {'saldo': 0}))
+
+    def test_simulacao_investimento(self):
+        status, resposta = requisitar(self.conexao, 'POST', '/api/simulacoes/investimento',
+                                      {'valor': 1000, 'taxa_anual': 10, 'meses': 12})
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(resposta['montante'], 1100)
+
+    def test_simulacao_fora_do_intervalo(self):
+        for corpo in ({'valor': 1000, 'taxa_anual': 1e308, 'meses': 1e308},
+                      {'valor': 1000, 'taxa_anual': 1e11, 'meses': 1e11},
+                      {'valor': 1000, 'taxa_anual': -150, 'meses': 12}):
+            with self.subTest(corpo=corpo):
+                self.assertEqual(requisitar(self.conexao, 'POST', '/api/simulacoes/investimento', corpo)[0], 400)
+        status, _ = requisitar(self.conexao, 'POST', '/api/simulacoes/negocio',
+                               {'investimento': 1e308, 'faturamento': 1e308})
+        self.assertEqual(status, 400)
+
+    def test_rota_desconhecida_consome_o_corpo(self):
+        status, _ = requisitar(self.conexao, 'POST', '/api/inexistente', {'valor': 1})
+        self.assertEqual(status, 404)
+        # Mesma conexão keep-alive: o corpo ignorado não pode virar a próxima requisição
+        self.assertEqual(requisitar(self.conexao, 'GET', '/api/saldo'), (200, {'saldo': 0}))
+
+    def test_content_length_invalido(self):
+        resposta = self.local.bruto(b'POST /api/transacoes HTTP/1.1\r\nHost: x\r\nContent-Length: xyz\r\n\r\n')
+        self.assertTrue(resposta.startswith('HTTP/1.1 400'), resposta)
+        self.assertIn('Connection: close', resposta)
+
+    def test_corpo_chunked_recusado(self):
+        resposta = self.local.bruto(
+            b'POST /api/transacoes HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n0\r\n\r\n')
+        self.assertTrue(resposta.startswith('HTTP/1.1 411'), resposta)
+
+    def test_conexao_ociosa_e_fechada(self):
+        self.conexao.close()
+        self.local.fechar()
+        with mock.patch.object(ManipuladorAPI, 'timeout', 0.5):
+            self.local = ServidorLocal()
+            self.conexao = self.local.conexao()
+            with socket.create_connection(('127.0.0.1', self.local.porta), timeout=5) as ociosa:
+                # Sem enviar nada: o servidor deve desistir em vez de prender a thread do pool
+                self.assertEqual(ociosa.recv(1), b'')
+
+
+class TestBancoEmArquivo(unittest.TestCase):
+    def test_caminho_com_caracteres_de_uri(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        caminho = os.path.join(pasta, 'dados #1', '100% ?livro.db')
+        os.makedirs(os.path.dirname(caminho))
+        local = ServidorLocal(caminho)
+        conexao = local.conexao()
+        try:
+            requisitar(conexao, 'POST', '/api/transacoes', {'tipo': 'receita', 'categoria': 'Freelance', 'valor': 80})
+            # As leituras passam pelas conexões somente leitura abertas por URI
+            self.assertEqual(requisitar(conexao, 'GET', '/api/saldo'), (200, {'saldo': 80}))
+        finally:
+            conexao.close()
+            local.fechar()
+
+
+if __name__ == '__main__':
+    unittest.main()